@@ -0,0 +1,184 @@
+# Headless benchmarks for the rules, the searches, the solver, the net and self-play.
+# Every run uses the same positions and seeds, so the work counts ("count") stay the
+# same from run to run; only the rates should move when the code gets faster or slower.
+#
+#   python othello_bench.py --save-baseline          # record bench_baseline.json
+#   python othello_bench.py                          # compare against it, exit 1 on a regression
+#   python othello_bench.py --only alphabeta,solver --out today.json
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from othello_core import legal_moves, flips, squares, parse_moves, START_BLACK, START_WHITE
+from othello_perft import perft
+
+BASELINE_FILE = "bench_baseline.json"
+THRESHOLD = 0.10  # a rate this much below the baseline counts as a regression
+REPEAT = 3        # each benchmark reports its best of this many runs
+SEED = 1
+
+# Test positions as move strings from the start (random games, seed 2024)
+POSITIONS = {
+    "opening": ["e6f4g3d6e3f6c7d7", "f5f6c4c5c6b5b6f3", "f5f6d3e3f7c4c3g6", "e6f4e3f6c5d2g7b6"],
+    "midgame": [
+        "f5d6c5b6d3f4e6g5c6c4g4g3e3d2h5g6d1f6h7c3d7d8f7f8a6e1",
+        "f5f6c4e3f4g3f2d2g4f3h4d3e6h5h3b5g7e7e2d6b4h2c3g6d7f1",
+        "d3c3b3d2f6b4c2b2a1a2d1e2a5d6e3g7c5f4c6f5f2b7c1a3g5f3",
+        "c4c5d6c3f4f5b4b5d2c7e6f3a6c2g6f7d7g5b8c8d8e2b2d3b1h5",
+    ],
+    "endgame": [  # 14 empties
+        "c4c3c2c5c6e3f4b6d3b2d2e1e6f2a6e7f7b1e8b4f5d6b5a7a1b3e2f3f1g1d1g8c7d7a8a4g7g4f6g5h4g3a5c8h2b7",
+        "e6f6c4d6g7f4d7h8f7b4f3c5a4e3g4g8f2c3b6d8b2c2f5c6d2a6b7c7b8a3a2f1a7a5e7h5g6a1h4h3g1h6g3g5d3c8",
+        "c4c3c2f4d3b2b3b1e3b4f3e6a3e2c6c5b5b6g4g3a1d2d1h4d6f1f7g8e1c1a7a6g1a8f5a4f2g5d7e8c7g2h3b8d8a2",
+        "e6f4g3d6c5c6e3b4c4h2f5d3b6d7a4a6c7d8e2f7f6g6b7a3h7g4b8a7h4f3e7e8b5f2c8g5g2c2g7h1d2h8b2a5f8f1",
+    ],
+}
+
+
+def position(moves):
+    # (side to move, other side, colour to move) after a move string
+    own, opp, player = START_BLACK, START_WHITE, 1
+    for sq in parse_moves(moves):
+        if not legal_moves(own, opp):
+            own, opp, player = opp, own, 3 - player
+        f = flips(own, opp, sq)
+        own, opp, player = opp ^ f, own | f | (1 << sq), 3 - player
+    return own, opp, player
+
+
+# --- Benchmarks: each does a fixed amount of work and returns (count, unit) ---
+def bench_movegen():
+    return sum(perft(*position(m)[:2], 5) for m in POSITIONS["opening"]), "leaves/s"
+
+def _search(pvs, depth):
+    from othello_engine import OthelloEngine
+    from othello_tt import zobrist_hash
+    nodes = 0
+    for m in POSITIONS["midgame"]:
+        own, opp, player = position(m)
+        engine = OthelloEngine()
+        engine.book = engine.patterns = None  # the positional evaluation, whatever files are around
+        key = zobrist_hash(*((own, opp) if player == 1 else (opp, own)), player)
+        engine.search_root(own, opp, player, key, depth, False, list(squares(legal_moves(own, opp))), pvs)
+        nodes += engine.nodes
+    return nodes, "nodes/s"
+
+def bench_alphabeta():
+    return _search(False, 5)
+
+def bench_pvs():
+    return _search(True, 5)
+
+def bench_solver():
+    from othello_solver import EndgameSolver
+    solver, nodes = EndgameSolver(), 0
+    for m in POSITIONS["endgame"]:
+        solver.clear()
+        solver.best_moves(*position(m)[:2])
+        nodes += solver.nodes
+    return nodes, "nodes/s"
+
+def bench_nn_forward():
+    import numpy as np
+    from othello_nn import SimpleDeepMind
+    random.seed(SEED)
+    net, states = SimpleDeepMind(), np.random.default_rng(SEED).integers(-1, 2, (16384, 64)).astype(float)
+    for i in range(0, len(states), 32):
+        net.predict_batch(states[i:i + 32])
+    return len(states), "samples/s"
+
+def bench_nn_train():
+    import numpy as np
+    from othello_nn import SimpleDeepMind
+    random.seed(SEED)
+    rng = np.random.default_rng(SEED)
+    net, states, targets = SimpleDeepMind(), rng.integers(-1, 2, (16384, 64)).astype(float), rng.random(16384)
+    for i in range(0, len(states), 32):
+        net.train_batch(states[i:i + 32], targets[i:i + 32])
+    return len(states), "samples/s"
+
+def bench_selfplay_evolver():
+    from othello_learner import self_play
+    rng = random.Random(SEED)
+    values = [[rng.random() for _ in range(8)] for _ in range(8)]
+    for _ in range(200):
+        self_play(values, rng)
+    return 200, "games/s"
+
+def bench_selfplay_nn():
+    from othello_nn import SimpleDeepMind, self_play
+    random.seed(SEED)
+    net, rng = SimpleDeepMind(), random.Random(SEED)
+    for _ in range(50):
+        self_play(net, 1, rng)
+    return 50, "games/s"
+
+BENCHMARKS = {
+    "movegen": bench_movegen,
+    "alphabeta": bench_alphabeta,
+    "pvs": bench_pvs,
+    "solver": bench_solver,
+    "nn_forward": bench_nn_forward,
+    "nn_train": bench_nn_train,
+    "selfplay_evolver": bench_selfplay_evolver,
+    "selfplay_nn": bench_selfplay_nn,
+}
+
+
+def run(names, repeat=REPEAT, report=print):
+    results = {}
+    for name in names:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count, unit = BENCHMARKS[name]()
+            best = min(best, time.perf_counter() - start)
+        results[name] = {"rate": round(count / best, 1), "unit": unit, "count": count, "seconds": round(best, 4)}
+        report(f"{name:18} {count / best:14,.0f} {unit:10} ({count} in {best:.3f}s)")
+    return results
+
+def compare(results, baseline, threshold=THRESHOLD, report=print):
+    # Returns the names that got slower by more than `threshold`
+    slower = []
+    for name, r in results.items():
+        if name not in baseline: continue
+        old = baseline[name]
+        ratio = r["rate"] / old["rate"]
+        note = ""
+        if r["count"] != old["count"]: note = f"  (work changed: {old['count']} -> {r['count']})"
+        if ratio < 1 - threshold:
+            slower.append(name)
+            note = "  REGRESSION" + note
+        report(f"{name:18} {ratio:6.2f}x baseline{note}")
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark rules, search, solver, net and self-play.")
+    parser.add_argument("--only", help="comma-separated subset of: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--out", help="JSON file receiving the results")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS: parser.error(f"unknown benchmark {name}")
+    results = run(names, args.repeat)
+    doc = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+    for path in filter(None, [args.out, args.baseline if args.save_baseline else None]):
+        with open(path, "w") as f:
+            json.dump(doc, f, indent=1)
+    if args.save_baseline or not os.path.exists(args.baseline): return
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    if compare(results, baseline, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# Opening book: move statistics for early positions, keyed by canonical position
+# so all 8 symmetric images share one entry.
+#
+# File layout (little-endian): header "OTHB", u16 version, u16 kind, u64 slot count,
+# then an open-addressing hash table of fixed-size records
+#   u64 own, u64 opp (canonical, side to move first), u8 move (canonical frame),
+#   u32 games, f32 value
+# Every (position, move) pair is its own record, inserted by linear probing from the
+# position's hash, so a lookup reads from that slot up to the next empty one.
+#
+#   python othello_book.py search --plies 8 --search-depth 6 -j 8       # deep search
+#   python othello_book.py games results.jsonl evolver.games --plies 12  # recorded games
+#   python othello_book.py show
+import argparse
+import mmap
+import os
+import random
+import struct
+from multiprocessing import Pool
+from othello_games import read_games
+from othello_core import (legal_moves, flips, popcount, squares, canonical, transform, square_name,
+                          SYM_SQUARES, SYM_INVERSE, START_BLACK, START_WHITE, FULL)
+
+BOOK_FILE = "opening.book"
+BOOK_PLIES = 12     # consult the book only this many plies into the game
+BOOK_VARIETY = 0.0  # also play moves this close to the best (book value units)
+MIN_GAMES = 3       # games-built books ignore moves seen fewer times
+
+MAGIC = b"OTHB"
+VERSION = 1
+SEARCHED, PLAYED = 0, 1  # kinds: value is a search score / the mover's mean game result (0-1)
+HEADER = struct.Struct("<4sHHQ")
+RECORD = struct.Struct("<QQBIf")
+
+
+def _slot(own, opp, mask):
+    return (((own * 0x9E3779B97F4A7C15) ^ (opp * 0xC2B2AE3D27D4EB4F)) & FULL) >> 20 & mask
+
+
+class OpeningBook:
+    def __init__(self, path=BOOK_FILE, plies=BOOK_PLIES, variety=BOOK_VARIETY, min_games=MIN_GAMES):
+        self.path, self.plies, self.variety, self.min_games = path, plies, variety, min_games
+        self.buf = None  # mapped on the first lookup; stays None if there is no book
+
+    def _load(self):
+        self.buf, self.mask = b"", -1
+        if not self.path or not os.path.exists(self.path): return
+        with open(self.path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.kind, slots = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path}: not a version {VERSION} opening book")
+        self.buf, self.mask = buf, slots - 1
+
+    def moves(self, own, opp):
+        # [(square, value, games)] for the side to move, in this position's own orientation
+        if self.buf is None: self._load()
+        if self.mask < 0: return []
+        c_own, c_opp, k = canonical(own, opp)
+        back = SYM_SQUARES[SYM_INVERSE[k]]
+        found, i = [], _slot(c_own, c_opp, self.mask)
+        while True:
+            r_own, r_opp, move, games, value = RECORD.unpack_from(self.buf, HEADER.size + i * RECORD.size)
+            if not r_own and not r_opp: return found
+            if r_own == c_own and r_opp == c_opp: found.append((back[move], value, games))
+            i = (i + 1) & self.mask
+
+    def choose(self, own, opp, rng=random):
+        # A book move or None. Moves within `variety` of the best are picked at random,
+        # weighted by how close they are.
+        if popcount(own | opp) - 4 >= self.plies: return None
+        moves = self.moves(own, opp)
+        if moves and self.kind == PLAYED:
+            moves = [m for m in moves if m[2] >= self.min_games]
+        if not moves: return None
+        best = max(value for _, value, _ in moves)
+        near = [(sq, value) for sq, value, _ in moves if value >= best - self.variety]
+        weights = [self.variety - (best - value) + 1e-9 for _, value in near]
+        return rng.choices([sq for sq, _ in near], weights)[0]
+
+
+def write_book(path, entries, kind):
+    # entries: {(own, opp): {move: (value, games)}} in canonical frames
+    records = [(pos, move, stats) for pos, moves in entries.items() for move, stats in moves.items()]
+    slots = 1
+    while slots < 2 * len(records) + 1: slots *= 2
+    table = bytearray(HEADER.size + slots * RECORD.size)
+    HEADER.pack_into(table, 0, MAGIC, VERSION, kind, slots)
+    taken = bytearray(slots)
+    for (own, opp), move, (value, games) in records:
+        i = _slot(own, opp, slots - 1)
+        while taken[i]: i = (i + 1) & (slots - 1)
+        taken[i] = 1
+        RECORD.pack_into(table, HEADER.size + i * RECORD.size, own, opp, move, games, value)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(table)
+    os.replace(tmp, path)
+    return len(records)
+
+def _book_move(own, opp, sq):
+    # (canonical own, canonical opp, move in that frame). A symmetric position (the
+    # start, say) has several frames; taking the lowest image of the move puts
+    # equivalent moves such as d3 and e6 under one record.
+    c_own, c_opp, _ = canonical(own, opp)
+    move = min(SYM_SQUARES[k][sq] for k in range(8) if transform(own, k) == c_own and transform(opp, k) == c_opp)
+    return c_own, c_opp, move
+
+def _add(entries, own, opp, sq, value, games):
+    # Records a move of `own` under the position's canonical key
+    c_own, c_opp, move = _book_move(own, opp, sq)
+    moves = entries.setdefault((c_own, c_opp), {})
+    old_value, old_games = moves.get(move, (0.0, 0))
+    total = old_games + games
+    moves[move] = ((old_value * old_games + value * games) / total if total else value, total)
+
+
+# --- Building from deep search ---
+_engine = None
+
+def _search_position(task):
+    # Full-window scores of every move at a fixed depth, from the mover's view
+    global _engine
+    from othello_engine import OthelloEngine, BLACK, WHITE
+    from othello_tt import zobrist_hash, update_hash
+    if _engine is None: _engine = OthelloEngine()
+    own, opp, depth = task
+    player = BLACK if popcount(own | opp) % 2 == 0 else WHITE  # no passes this early
+    key = zobrist_hash(*((own, opp) if player == BLACK else (opp, own)), player)
+    _engine.reset_patterns(own, opp, player)
+    _engine.tt.new_search()
+    scores = {}
+    for sq in squares(legal_moves(own, opp)):
+        f = flips(own, opp, sq)
+        child = (own | f | (1 << sq), opp ^ f)
+        if _engine.patterns: _engine.patterns.play(sq, f, player)
+        scores[sq] = _engine.minimax_alpha_beta(child, depth - 1, -float("inf"), float("inf"), False, player,
+                                                False, update_hash(key, player, sq, f))
+        if _engine.patterns: _engine.patterns.undo(sq, f, player)
+    return own, opp, scores
+
+def build_from_search(plies, depth, margin, jobs=1, report=print):
+    # Searches every position reachable by moves within `margin` of the best, ply by ply
+    entries, frontier = {}, {canonical(START_BLACK, START_WHITE)[:2]}
+    pool = Pool(jobs) if jobs > 1 else None
+    try:
+        for ply in range(plies):
+            tasks = [(own, opp, depth) for own, opp in frontier if legal_moves(own, opp)]
+            results = pool.imap_unordered(_search_position, tasks) if pool else map(_search_position, tasks)
+            frontier = set()
+            for own, opp, scores in results:
+                best = max(scores.values())
+                for sq, score in scores.items():
+                    _add(entries, own, opp, sq, float(score), 0)
+                    if score >= best - margin:
+                        f = flips(own, opp, sq)
+                        frontier.add(canonical(opp ^ f, own | f | (1 << sq))[:2])
+            report(f"ply {ply + 1}: {len(tasks)} positions searched, {len(frontier)} to expand")
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    return entries
+
+
+# --- Building from game records ---
+def build_from_games(games, plies):
+    # games: iterable of (move list, black discs, white discs). Each move scores the
+    # mover's result: 1 win, 0.5 draw, 0 loss.
+    entries = {}
+    for moves, black_discs, white_discs in games:
+        result = {1: 1.0 if black_discs > white_discs else 0.0 if black_discs < white_discs else 0.5}
+        result[2] = 1.0 - result[1]
+        own, opp, player = START_BLACK, START_WHITE, 1
+        for sq in moves[:plies]:
+            if not legal_moves(own, opp):
+                own, opp, player = opp, own, 3 - player
+            f = flips(own, opp, sq)
+            if not f: break
+            _add(entries, own, opp, sq, result[player], 1)
+            own, opp, player = opp ^ f, own | f | (1 << sq), 3 - player
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect the opening book.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    s = sub.add_parser("search", help="score positions by deep search")
+    s.add_argument("--plies", type=int, default=8)
+    s.add_argument("--search-depth", type=int, default=6)
+    s.add_argument("--margin", type=float, default=4, help="also expand moves this close to the best")
+    s.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    g = sub.add_parser("games", help="aggregate recorded games")
+    g.add_argument("files", nargs="+", help="game archives (.games) or othello_match.py JSONL files")
+    g.add_argument("--plies", type=int, default=BOOK_PLIES)
+    for p in (s, g):
+        p.add_argument("--out", default=BOOK_FILE)
+    show = sub.add_parser("show", help="print the book moves of the start position")
+    show.add_argument("path", nargs="?", default=BOOK_FILE)
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        book = OpeningBook(args.path)
+        for sq, value, games in sorted(book.moves(START_BLACK, START_WHITE), key=lambda m: -m[1]):
+            print(f"{square_name(sq)}  value {value:.3f}  games {games}")
+        return
+    if args.command == "search":
+        entries, kind = build_from_search(args.plies, args.search_depth, args.margin, args.jobs), SEARCHED
+    else:
+        entries, kind = build_from_games(read_games(args.files), args.plies), PLAYED
+    print(f"{write_book(args.out, entries, kind)} moves in {len(entries)} positions written to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# Bitboard Othello rules shared by othello.py, othello_evolver.py and othello_deepmind.py.
+# A position is two 64-bit ints (own, opp); bit r*8+c is square (r, c).
+
+FULL = 0xFFFFFFFFFFFFFFFF
+NOT_A_FILE = 0xFEFEFEFEFEFEFEFE  # everything except column 0
+NOT_H_FILE = 0x7F7F7F7F7F7F7F7F  # everything except column 7
+
+START_BLACK = (1 << 28) | (1 << 35)  # d5, e4 -> board[3][4], board[4][3]
+START_WHITE = (1 << 27) | (1 << 36)  # board[3][3], board[4][4]
+
+# (shift, mask) per direction: positive shifts move towards higher squares.
+# The mask removes bits that wrapped around a row edge.
+DIRECTIONS = (
+    (1, NOT_A_FILE),   # east
+    (-1, NOT_H_FILE),  # west
+    (8, FULL),         # south
+    (-8, FULL),        # north
+    (9, NOT_A_FILE),   # south-east
+    (7, NOT_H_FILE),   # south-west
+    (-7, NOT_A_FILE),  # north-east
+    (-9, NOT_H_FILE),  # north-west
+)
+
+def shift(b, d):
+    return (b << d) & FULL if d > 0 else b >> -d
+
+def legal_moves(own, opp):
+    # Bitmask of squares where `own` may play
+    empty = ~(own | opp) & FULL
+    moves = 0
+    for d, mask in DIRECTIONS:
+        o = opp & mask
+        if d > 0:
+            x = (own << d) & o
+            x |= (x << d) & o
+            x |= (x << d) & o
+            x |= (x << d) & o
+            x |= (x << d) & o
+            x |= (x << d) & o
+            moves |= (x << d) & mask
+        else:
+            d = -d
+            x = (own >> d) & o
+            x |= (x >> d) & o
+            x |= (x >> d) & o
+            x |= (x >> d) & o
+            x |= (x >> d) & o
+            x |= (x >> d) & o
+            moves |= (x >> d) & mask
+    return moves & empty
+
+# RAYS[sq]: for each direction with room for a flip, the square bits walking away from sq
+RAYS = []
+for _sq in range(64):
+    _rays = []
+    for _dr, _dc in ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)):
+        _r, _c, _ray = (_sq >> 3) + _dr, (_sq & 7) + _dc, []
+        while 0 <= _r < 8 and 0 <= _c < 8:
+            _ray.append(1 << (_r * 8 + _c))
+            _r, _c = _r + _dr, _c + _dc
+        if len(_ray) >= 2: _rays.append(tuple(_ray))
+    RAYS.append(tuple(_rays))
+NEIGHBOURS = [sum(ray[0] for ray in rays) for rays in RAYS]  # adjacent squares that can start a flip
+
+def flips(own, opp, sq):
+    # Bitmask of opponent discs turned over by `own` playing at sq (0 if illegal)
+    if (own | opp) >> sq & 1 or not opp & NEIGHBOURS[sq]: return 0
+    flipped = 0
+    for ray in RAYS[sq]:
+        line = 0
+        for b in ray:
+            if opp & b: line |= b
+            else:
+                if own & b: flipped |= line
+                break
+    return flipped
+
+def make_move(own, opp, sq):
+    # Returns (own, opp, flipped) after `own` plays sq; sides are NOT swapped
+    f = flips(own, opp, sq)
+    return own | f | (1 << sq), opp ^ f, f
+
+def undo_move(own, opp, sq, f):
+    return own ^ (f | (1 << sq)), opp | f
+
+def popcount(b):
+    return bin(b).count("1")
+
+def squares(b):
+    # Yields square indices of the set bits, lowest first
+    while b:
+        lsb = b & -b
+        yield lsb.bit_length() - 1
+        b ^= lsb
+
+def is_game_over(own, opp):
+    return not legal_moves(own, opp) and not legal_moves(opp, own)
+
+# --- Board symmetries ---
+# Symmetry k (0-7) mirrors columns if k & 1, mirrors rows if k & 2, then transposes if k & 4.
+def mirror_columns(b):
+    b = ((b >> 1) & 0x5555555555555555) | ((b & 0x5555555555555555) << 1)
+    b = ((b >> 2) & 0x3333333333333333) | ((b & 0x3333333333333333) << 2)
+    return ((b >> 4) & 0x0F0F0F0F0F0F0F0F) | ((b & 0x0F0F0F0F0F0F0F0F) << 4)
+
+def mirror_rows(b):
+    return int.from_bytes(b.to_bytes(8, "little"), "big")
+
+def transpose(b):
+    # Swaps (r, c) and (c, r)
+    t = 0x0F0F0F0F00000000 & (b ^ (b << 28))
+    b ^= t ^ (t >> 28)
+    t = 0x3333000033330000 & (b ^ (b << 14))
+    b ^= t ^ (t >> 14)
+    t = 0x5500550055005500 & (b ^ (b << 7))
+    return b ^ t ^ (t >> 7)
+
+def transform(b, k):
+    if k & 1: b = mirror_columns(b)
+    if k & 2: b = mirror_rows(b)
+    if k & 4: b = transpose(b)
+    return b
+
+def _transform_square(sq, k):
+    r, c = sq >> 3, sq & 7
+    if k & 1: c = 7 - c
+    if k & 2: r = 7 - r
+    if k & 4: r, c = c, r
+    return r * 8 + c
+
+SYM_SQUARES = [[_transform_square(sq, k) for sq in range(64)] for k in range(8)]  # where sq goes under k
+SYM_INVERSE = [0, 1, 2, 3, 4, 6, 5, 7]  # undoes symmetry k
+
+def canonical(own, opp):
+    # (own, opp, k): the smallest of the 8 symmetric images and the symmetry giving it,
+    # so mirrored or rotated positions share one key
+    best = (own, opp, 0)
+    for k in range(1, 8):
+        o = transform(own, k)
+        if o < best[0] or (o == best[0] and transform(opp, k) < best[1]):
+            best = (o, transform(opp, k), k)
+    return best
+
+# --- Conversions for the list-based boards used by the GUIs ---
+def from_grid(board, player):
+    # 8x8 list with EMPTY/BLACK/WHITE (0/1/2) -> (own, opp) for player
+    own = opp = 0
+    for r in range(8):
+        row = board[r]
+        for c in range(8):
+            v = row[c]
+            if v == player: own |= 1 << (r * 8 + c)
+            elif v: opp |= 1 << (r * 8 + c)
+    return own, opp
+
+def to_grid(black, white):
+    return [[1 if black >> (r * 8 + c) & 1 else 2 if white >> (r * 8 + c) & 1 else 0
+             for c in range(8)] for r in range(8)]
+
+def from_flat(board, p):
+    # 64-list with +1/-1/0 (othello_deepmind.py) -> (own, opp) for p
+    own = opp = 0
+    for i, v in enumerate(board):
+        if v == p: own |= 1 << i
+        elif v: opp |= 1 << i
+    return own, opp
+
+def to_squares(b):
+    return [(sq >> 3, sq & 7) for sq in squares(b)]
+
+def square_name(sq):
+    return "abcdefgh"[sq & 7] + str((sq >> 3) + 1)
+
+def parse_moves(text):
+    # "f5d6c3" -> [37, 43, 18]
+    text = text.strip().lower()
+    return [(int(text[i + 1]) - 1) * 8 + "abcdefgh".index(text[i]) for i in range(0, len(text), 2)]
+
+
+class Position:
+    # Side-to-move position with make/undo; `own` is always the player to move.
+    __slots__ = ("own", "opp", "player", "stack")
+
+    def __init__(self, own=START_BLACK, opp=START_WHITE, player=1):
+        self.own, self.opp, self.player = own, opp, player
+        self.stack = []
+
+    def moves(self):
+        return legal_moves(self.own, self.opp)
+
+    def play(self, sq):
+        f = flips(self.own, self.opp, sq)
+        self.stack.append((sq, f))
+        self.own, self.opp = self.opp ^ f, self.own | f | (1 << sq)
+        self.player = 3 - self.player
+        return f
+
+    def pass_turn(self):
+        self.stack.append((-1, 0))
+        self.own, self.opp = self.opp, self.own
+        self.player = 3 - self.player
+
+    def undo(self):
+        sq, f = self.stack.pop()
+        self.own, self.opp = self.opp, self.own
+        self.player = 3 - self.player
+        if sq >= 0:
+            self.own ^= f | (1 << sq)
+            self.opp |= f
+
+    def empties(self):
+        return 64 - popcount(self.own | self.opp)
+
+    def is_over(self):
+        return is_game_over(self.own, self.opp)
@@ -0,0 +1,395 @@
+# Search engine behind the "Othello AI Laboratory" players. No GUI code here, so
+# headless tools can import it without a display.
+import random
+import threading
+import time
+from othello_core import legal_moves, flips, make_move, popcount, squares, from_grid, canonical
+from othello_tt import TranspositionTable, zobrist_hash, update_hash, flip_bound, EXACT, LOWER, UPPER, NO_MOVE, ZOBRIST_SIDE
+from othello_solver import EndgameSolver, SearchTimeout
+from othello_book import OpeningBook
+from othello_pattern import PatternEval
+from othello_stats import SearchStats, profile_call
+
+EMPTY, BLACK, WHITE = 0, 1, 2
+DEPTH = 4  # Default depth (Minimax)
+TIME_BUDGET = 1.0  # Seconds per move for the iterative-deepening Alpha-Beta players
+MAX_DEPTH = 30
+SOLVE_LIMIT = 14 # Number of empty squares to start perfect endgame solving
+TT_SIZE_MB = 16 # Memory for the alpha-beta transposition table
+
+POSITION_VALUES = [
+    [100, -20,  10,   5,   5,  10, -20, 100],
+    [-20, -50,  -2,  -2,  -2,  -2, -50, -20],
+    [ 10,  -2,   5,   1,   1,   5,  -2,  10],
+    [  5,  -2,   1,   1,   1,   1,  -2,   5],
+    [  5,  -2,   1,   1,   1,   1,  -2,   5],
+    [ 10,  -2,   5,   1,   1,   5,  -2,  10],
+    [-20, -50,  -2,  -2,  -2,  -2, -50, -20],
+    [100, -20,  10,   5,   5,  10, -20, 100],
+]
+
+STRATEGIES = ["Minimax", "Alpha-Beta", "Alpha-Beta + Solver", "PVS"]
+
+# SQUARE_VALUES[r*8+c] = POSITION_VALUES[r][c], used for move ordering
+SQUARE_VALUES = [v for row in POSITION_VALUES for v in row]
+
+def row_values(table):
+    # [r][byte] = sum of table[r][c] over the discs of one board row
+    return [[sum(table[r][c] for c in range(8) if bits >> c & 1) for bits in range(256)] for r in range(8)]
+
+ROW_VALUES = row_values(POSITION_VALUES)
+
+class OthelloEngine:
+    # Holds the search state (table, solver, killers, history) between moves.
+    # self.board is the 8x8 EMPTY/BLACK/WHITE grid that think() moves on.
+    def __init__(self):
+        self.board = [[EMPTY] * 8 for _ in range(8)]
+        self.tt = TranspositionTable(TT_SIZE_MB)
+        self.solver = EndgameSolver()
+        self.deadline = None
+        self.stop_event = threading.Event()  # set from another thread, ends the running iterative deepening
+        self.nodes = 0
+        self.last_depth = 0
+        self.last_nps = 0
+        self.progress = None  # callback for each completed iteration: depth, move, nodes, nps
+        self.search_start = 0
+        self.killers = [[NO_MOVE, NO_MOVE] for _ in range(MAX_DEPTH + 1)]
+        self.history = [0] * 64
+        self.book = OpeningBook()  # opening.book if present; set to None to always search
+        self.patterns = PatternEval()  # patterns.weights if present, else the POSITION_VALUES evaluation
+        self.row_values = ROW_VALUES  # the positional evaluation's table, as row_values() of a symmetric 8x8 table
+        self.parallel = None  # an othello_parallel.ParallelSearch to share root moves over processes
+        self.stats = None  # an othello_stats.SearchStats while statistics are wanted
+
+    def think(self, player, strategy, time_budget=TIME_BUDGET, progress=None):
+        own, opp = from_grid(self.board, player)
+        moves = legal_moves(own, opp)
+        if not moves: return None
+        if self.stats: self.stats.start(self)
+        
+        if self.book:
+            sq = self.book.choose(own, opp)
+            if sq is not None and moves >> sq & 1:
+                self.nodes, self.last_depth, self.last_nps = 0, 0, 0
+                if self.stats: self.stats.finish(self, strategy, player, sq, 0, book=True)
+                return (sq >> 3, sq & 7)
+        
+        empty_count = 64 - popcount(own | opp)
+        use_solver = "Solver" in strategy and empty_count <= SOLVE_LIMIT
+        
+        key = zobrist_hash(own, opp, player) if player == BLACK else zobrist_hash(opp, own, player)
+        self.reset_patterns(own, opp, player)
+        self.tt.new_search()
+        self.nodes = 0
+        self.progress = progress
+        start = self.search_start = time.perf_counter()
+        
+        if use_solver:
+            # Perfect play: maximize the final disc difference, unless time runs out first
+            s = self.solver
+            s.clear()
+            s.stats, s.deadline, s.stop_event = self.stats, start + time_budget, self.stop_event
+            _, best_moves = s.best_moves(own, opp)
+            self.nodes, self.last_depth = s.nodes, empty_count if s.complete else 0
+        elif "Alpha-Beta" in strategy or strategy == "PVS":
+            best_moves = self.iterative_deepening(own, opp, player, key, time_budget, strategy == "PVS")
+        else:
+            best_moves = []
+            best_score = -float('inf')
+            if self.stats:
+                self.stats.root_depth = DEPTH
+                self.stats.expand(0, popcount(moves))
+            for sq in squares(moves):
+                t = make_move(own, opp, sq)
+                if self.patterns: self.patterns.play(sq, t[2], player)
+                score = self.minimax_basic(t[:2], DEPTH-1, False, player)
+                if self.patterns: self.patterns.undo(sq, t[2], player)
+                if score > best_score:
+                    best_score = score
+                    best_moves = [sq]
+                elif score == best_score:
+                    best_moves.append(sq)
+            self.last_depth = DEPTH
+        
+        elapsed = time.perf_counter() - start
+        self.last_nps = self.nodes / elapsed if elapsed > 0 else 0
+        sq = random.choice(best_moves)
+        if self.stats: self.stats.finish(self, strategy, player, sq, elapsed)
+        self.report(self.last_depth, sq)
+        self.progress = None
+        return (sq >> 3, sq & 7)
+
+    def reset_patterns(self, own, opp, player):
+        # Loads the pattern weights on first use and points their indices at this
+        # position; the searches then play and undo every move on them
+        if self.patterns and not self.patterns.load(): self.patterns = None
+        if self.patterns: self.patterns.reset(*((own, opp) if player == BLACK else (opp, own)))
+
+    def symmetric_eval(self):
+        # Mirror-image positions score the same, so a root move may take the score of
+        # its image: true of the positional tables, and of pattern weights fitted with
+        # augmentation
+        return not self.patterns or self.patterns.symmetric
+
+    def report(self, depth, sq):
+        if self.progress:
+            elapsed = time.perf_counter() - self.search_start
+            self.progress(depth=depth, move=(sq >> 3, sq & 7), nodes=self.nodes,
+                          nps=self.nodes / elapsed if elapsed > 0 else 0, **(self.stats.live(self) if self.stats else {}))
+
+    def iterative_deepening(self, own, opp, player, key, time_budget, pvs=False):
+        # Deepen one ply at a time until the budget runs out; answer with the last
+        # completed iteration. Each iteration searches the previous best moves first.
+        order = list(squares(legal_moves(own, opp)))
+        best_moves = order[:1]
+        max_depth = min(MAX_DEPTH, 64 - popcount(own | opp))
+        self.deadline = time.perf_counter() + time_budget
+        if pvs:
+            self.killers = [[NO_MOVE, NO_MOVE] for _ in range(MAX_DEPTH + 1)]
+            self.history = [h >> 4 for h in self.history]  # keep a little of the last move's history
+        try:
+            for depth in range(1, max_depth + 1):
+                if self.parallel:
+                    _, best_moves, scores = self.parallel.search_root(self, own, opp, player, key, depth, order, pvs)
+                else:
+                    _, best_moves, scores = self.search_root(own, opp, player, key, depth, False, order, pvs)
+                self.last_depth = depth
+                order.sort(key=lambda sq: scores[sq], reverse=True)
+                self.report(depth, best_moves[0])
+        except SearchTimeout:
+            self.reset_patterns(own, opp, player)  # the search stopped between play() and undo()
+        finally:
+            self.deadline = None
+        return best_moves
+
+    def search_root(self, own, opp, player, key, depth, is_solving, order, pvs=False):
+        # Returns (best score, best squares, score per square)
+        best_moves = []
+        best_score = -float('inf')
+        scores = {}
+        seen = {}  # canonical child -> square already searched
+        pe = self.patterns
+        dedupe = self.symmetric_eval()
+        if self.stats:
+            self.stats.root_depth = depth
+            self.stats.expand(0, len(order))
+        
+        for sq in order:
+            t = make_move(own, opp, sq)
+            image = canonical(t[0], t[1])[:2] if dedupe else sq
+            if image in seen:
+                # A mirror image of a searched move (common in the opening) scores the same
+                score = scores[sq] = scores[seen[image]]
+                if score == best_score: best_moves.append(sq)
+                continue
+            seen[image] = sq
+            child_key = update_hash(key, player, sq, t[2])
+            if pe: pe.play(sq, t[2], player)
+            # Scores are integers, so a window opening just below the best score
+            # still tells ties apart exactly while cutting everything worse
+            if not pvs:
+                score = self.minimax_alpha_beta(t[:2], depth-1, best_score - 1, float('inf'), False, player, is_solving, child_key)
+            elif not best_moves:
+                score = -self.negamax_pvs(t[1], t[0], depth-1, -float('inf'), float('inf'), child_key, 3-player, 1)
+            else:
+                # Null window: only moves at least as good as the best get a full re-search
+                score = -self.negamax_pvs(t[1], t[0], depth-1, -best_score, -best_score + 1, child_key, 3-player, 1)
+                if score >= best_score:
+                    score = -self.negamax_pvs(t[1], t[0], depth-1, -float('inf'), -best_score + 1, child_key, 3-player, 1)
+            if pe: pe.undo(sq, t[2], player)
+            scores[sq] = score
+            if score > best_score:
+                best_score = score
+                best_moves = [sq]
+            elif score == best_score:
+                best_moves.append(sq)
+        
+        return best_score, best_moves, scores
+
+    # Search boards are bitboard pairs (ai_player's discs, opponent's discs).
+    # Scores are from ai_player's view; the table holds them from the side to move.
+    def minimax_alpha_beta(self, board, depth, alpha, beta, is_max, ai_player, is_solving, key):
+        self.nodes += 1
+        if self.deadline and not self.nodes & 1023 and (time.perf_counter() > self.deadline or self.stop_event.is_set()):
+            raise SearchTimeout
+        if depth == 0:
+            return self.evaluate(board, ai_player, is_solving)
+        
+        me, opp = board
+        moves = legal_moves(me, opp) if is_max else legal_moves(opp, me)
+        
+        if not moves:
+            return self.minimax_alpha_beta(board, depth-1, alpha, beta, not is_max, ai_player, is_solving, key ^ ZOBRIST_SIDE)
+
+        alpha0, beta0 = alpha, beta
+        hash_move = NO_MOVE
+        entry = self.tt.probe(key)
+        if entry:
+            e_depth, flag, score, hash_move = entry
+            if e_depth >= depth:
+                if not is_max: score, flag = -score, flip_bound(flag)
+                if flag == EXACT: return score
+                if flag == LOWER: alpha = max(alpha, score)
+                else: beta = min(beta, score)
+                if beta <= alpha: return score
+        
+        order = list(squares(moves))
+        if hash_move in order:
+            order.remove(hash_move)
+            order.insert(0, hash_move)
+        
+        current = ai_player if is_max else 3 - ai_player
+        pe = self.patterns
+        st = self.stats
+        if st: st.expand(st.root_depth - depth, len(order))
+        best_move = NO_MOVE
+        if is_max:
+            v = -float('inf')
+            for sq in order:
+                f = flips(me, opp, sq)
+                if pe: pe.play(sq, f, current)
+                score = self.minimax_alpha_beta((me | f | (1 << sq), opp ^ f), depth-1, alpha, beta, False, ai_player, is_solving, update_hash(key, current, sq, f))
+                if pe: pe.undo(sq, f, current)
+                if score > v: v, best_move = score, sq
+                alpha = max(alpha, v)
+                if beta <= alpha:
+                    if st: st.cutoff(sq == order[0])
+                    break
+        else:
+            v = float('inf')
+            for sq in order:
+                f = flips(opp, me, sq)
+                if pe: pe.play(sq, f, current)
+                score = self.minimax_alpha_beta((me ^ f, opp | f | (1 << sq)), depth-1, alpha, beta, True, ai_player, is_solving, update_hash(key, current, sq, f))
+                if pe: pe.undo(sq, f, current)
+                if score < v: v, best_move = score, sq
+                beta = min(beta, v)
+                if beta <= alpha:
+                    if st: st.cutoff(sq == order[0])
+                    break
+        
+        flag = UPPER if v <= alpha0 else LOWER if v >= beta0 else EXACT
+        if is_max: self.tt.store(key, depth, flag, v, best_move)
+        else: self.tt.store(key, depth, flip_bound(flag), -v, best_move)
+        return v
+
+    # Negamax with principal-variation (null-window) re-search. own is the side to
+    # move, so scores and table entries are all from the mover's view.
+    def negamax_pvs(self, own, opp, depth, alpha, beta, key, player, ply):
+        self.nodes += 1
+        if self.deadline and not self.nodes & 1023 and (time.perf_counter() > self.deadline or self.stop_event.is_set()):
+            raise SearchTimeout
+        if depth == 0:
+            return self.evaluate((own, opp), player, False)
+        
+        moves = legal_moves(own, opp)
+        if not moves:
+            return -self.negamax_pvs(opp, own, depth-1, -beta, -alpha, key ^ ZOBRIST_SIDE, 3-player, ply+1)
+        
+        alpha0 = alpha
+        hash_move = NO_MOVE
+        entry = self.tt.probe(key)
+        if entry:
+            e_depth, flag, score, hash_move = entry
+            if e_depth >= depth:
+                if flag == EXACT: return score
+                if flag == LOWER: alpha = max(alpha, score)
+                else: beta = min(beta, score)
+                if beta <= alpha: return score
+        
+        order = self.order_moves(moves, hash_move, ply)
+        killers, history = self.killers[ply], self.history
+        pe = self.patterns
+        st = self.stats
+        if st: st.expand(ply, len(order))
+        best, best_move = -float('inf'), NO_MOVE
+        for sq in order:
+            f = flips(own, opp, sq)
+            child_key = update_hash(key, player, sq, f)
+            n_own, n_opp = opp ^ f, own | f | (1 << sq)
+            if pe: pe.play(sq, f, player)
+            if best_move == NO_MOVE:
+                score = -self.negamax_pvs(n_own, n_opp, depth-1, -beta, -alpha, child_key, 3-player, ply+1)
+            else:
+                score = -self.negamax_pvs(n_own, n_opp, depth-1, -alpha-1, -alpha, child_key, 3-player, ply+1)
+                if alpha < score < beta:
+                    score = -self.negamax_pvs(n_own, n_opp, depth-1, -beta, -alpha, child_key, 3-player, ply+1)
+            if pe: pe.undo(sq, f, player)
+            if score > best:
+                best, best_move = score, sq
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if st: st.cutoff(sq == order[0])
+                        if killers[0] != sq: killers[1], killers[0] = killers[0], sq
+                        history[sq] += depth * depth
+                        break
+        
+        flag = UPPER if best <= alpha0 else LOWER if best >= beta else EXACT
+        self.tt.store(key, depth, flag, best, best_move)
+        return best
+
+    def order_moves(self, moves, hash_move, ply):
+        # Hash/PV move, then killers, then history plus static square value
+        killers, history = self.killers[ply], self.history
+        scored = []
+        for sq in squares(moves):
+            if sq == hash_move: s = 1 << 40
+            elif sq == killers[0]: s = 1 << 39
+            elif sq == killers[1]: s = 1 << 38
+            else: s = history[sq] + SQUARE_VALUES[sq]
+            scored.append((s, sq))
+        scored.sort(reverse=True)
+        return [sq for _, sq in scored]
+
+    def minimax_basic(self, board, depth, is_max, ai_player):
+        self.nodes += 1
+        if depth == 0: return self.evaluate(board, ai_player, False)
+        me, opp = board
+        moves = legal_moves(me, opp) if is_max else legal_moves(opp, me)
+        if not moves: return self.minimax_basic(board, depth-1, not is_max, ai_player)
+        
+        current = ai_player if is_max else 3 - ai_player
+        pe = self.patterns
+        if self.stats: self.stats.expand(DEPTH - depth, popcount(moves))
+        scores = []
+        for sq in squares(moves):
+            if is_max:
+                f = flips(me, opp, sq)
+                t = (me | f | (1 << sq), opp ^ f)
+            else:
+                f = flips(opp, me, sq)
+                t = (me ^ f, opp | f | (1 << sq))
+            if pe: pe.play(sq, f, current)
+            scores.append(self.minimax_basic(t, depth-1, not is_max, ai_player))
+            if pe: pe.undo(sq, f, current)
+        return max(scores) if is_max else min(scores)
+
+    def evaluate(self, board, player, is_solving):
+        me, opp = board
+        if self.stats: self.stats.evals += 1
+        if is_solving:
+            # Return stone difference
+            return popcount(me) - popcount(opp)
+        if self.patterns:
+            # Pattern tables, kept in step with the search by play()/undo()
+            score = self.patterns.score()
+            return score if player == BLACK else -score
+        # Positional evaluation, one table lookup per row and side
+        score, rows = 0, self.row_values
+        for r in range(8):
+            score += rows[r][me >> (r * 8) & 255] - rows[r][opp >> (r * 8) & 255]
+        return score
+
+
+def think_job(engine, progress, board, player, strategy, time_budget=TIME_BUDGET, stats=False, stats_log=None,
+              profile=None):
+    # othello_worker job: one move for `player` on the 8x8 grid `board`. With stats the
+    # result carries the move's search statistics; profile: cProfile file for this move.
+    engine.board = board
+    engine.stats = SearchStats(stats_log) if stats else None
+    if profile: move = profile_call(profile, engine.think, player, strategy, time_budget, progress)
+    else: move = engine.think(player, strategy, time_budget, progress)
+    result = {"move": move, "depth": engine.last_depth, "nodes": engine.nodes, "nps": engine.last_nps}
+    if engine.stats: result["stats"] = engine.stats.last
+    return result
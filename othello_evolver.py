@@ -1,13 +1,16 @@
 import tkinter as tk
-from tkinter import messagebox
-import random
-import json
+from tkinter import messagebox, ttk
 import os
+from othello_core import legal_moves, flips, from_grid, to_grid, to_squares
+import othello_learner
+from othello_learner import KNOWLEDGE_FILE, LEGACY_KNOWLEDGE_FILE
+from othello_worker import Worker, PROGRESS, ERROR
+from othello_view import BoardView, RENDER_CHOICES, RENDER_EVERY
 
 BOARD_SIZE = 8
 SQUARE_SIZE = 50
+POLL_MS = 100 # How often the GUI collects reports from the training worker
 EMPTY, BLACK, WHITE = 0, 1, 2
-KNOWLEDGE_FILE = "knowledge.json"
 
 class OthelloEvolver:
     def __init__(self, master):
@@ -23,20 +26,16 @@ class OthelloEvolver:
         # Training stats
         self.match_count = 0
         self.is_training = False
+        self.worker = Worker()
 
     def load_knowledge(self):
-        if os.path.exists(KNOWLEDGE_FILE):
-            with open(KNOWLEDGE_FILE, "r") as f:
-                self.position_values = json.load(f)
-            print("Knowledge loaded from file.")
-        else:
-            # Start with a flat (neutral) table if no knowledge exists
-            self.position_values = [[0.0 for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
-            print("New knowledge initialized.")
+        # Start with a flat (neutral) table if no knowledge exists
+        self.position_values = othello_learner.load_knowledge(KNOWLEDGE_FILE)
+        found = os.path.exists(KNOWLEDGE_FILE) or os.path.exists(LEGACY_KNOWLEDGE_FILE)
+        print("Knowledge loaded from file." if found else "New knowledge initialized.")
 
     def save_knowledge(self):
-        with open(KNOWLEDGE_FILE, "w") as f:
-            json.dump(self.position_values, f)
+        othello_learner.save_knowledge(self.position_values, KNOWLEDGE_FILE)
 
     def setup_gui(self):
         control_panel = tk.Frame(self.master)
@@ -48,11 +47,24 @@ class OthelloEvolver:
         self.save_btn = tk.Button(control_panel, text="Save Knowledge", command=self.save_knowledge)
         self.save_btn.pack(side=tk.LEFT, padx=5)
 
+        self.augment = tk.BooleanVar(value=othello_learner.AUGMENT)
+        tk.Checkbutton(control_panel, text="Augment x8", variable=self.augment).pack(side=tk.LEFT, padx=5)
+
+        tk.Label(control_panel, text="Render:").pack(side=tk.LEFT)
+        self.render_type = ttk.Combobox(control_panel, values=RENDER_CHOICES, width=11, state="readonly")
+        self.render_type.current(0)
+        self.render_type.bind("<<ComboboxSelected>>", lambda e: self.set_render())
+        self.render_type.pack(side=tk.LEFT, padx=5)
+
         self.info_label = tk.Label(self.master, text="Matches Played: 0", font=("Arial", 12))
         self.info_label.pack()
 
         self.canvas = tk.Canvas(self.master, width=400, height=400, bg="dark green")
         self.canvas.pack()
+        self.view = BoardView(self.canvas, SQUARE_SIZE, 2)
+
+    def set_render(self):
+        self.view.every = RENDER_EVERY[self.render_type.get()]
 
     def reset_game(self):
         self.board = [[EMPTY for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
@@ -65,113 +77,54 @@ class OthelloEvolver:
         self.is_training = not self.is_training
         self.train_btn.config(text="Stop Learning" if self.is_training else "Start Auto-Learning")
         if self.is_training:
-            self.run_match()
-
-    def run_match(self):
-        if not self.is_training: return
-        
-        moves = self.get_legal_moves(self.board, self.current_player)
-        if moves:
-            # AI chooses move based on current position_values
-            row, col = self.choose_best_move(moves)
-            self.history[self.current_player].append((row, col))
-            self.apply_move(self.board, row, col, self.current_player)
-            self.draw_board()
-        
-        # Switch player
-        self.current_player = 3 - self.current_player
-        
-        # Check if next player can move
-        if not self.get_legal_moves(self.board, self.current_player):
-            self.current_player = 3 - self.current_player
-            # If neither can move, game over
-            if not self.get_legal_moves(self.board, self.current_player):
-                self.learn_from_result()
-                self.match_count += 1
+            # Learning runs in the worker process; the GUI only shows its reports
+            self.base_count = self.match_count
+            job = self.worker.submit(othello_learner.train_job, self.position_values, self.augment.get())
+            self.master.after(POLL_MS, self.poll_training, job)
+        else:
+            self.worker.cancel()
+
+    def poll_training(self, job):
+        if not self.is_training or job != self.worker.job_id: return
+        for kind, payload in self.worker.poll():
+            if kind == PROGRESS:
+                self.position_values = payload["values"]
+                self.match_count = self.base_count + payload["matches"]
                 self.info_label.config(text=f"Matches Played: {self.match_count}")
-                self.reset_game()
-                # Fast forward to next match
-                self.master.after(10, self.run_match)
+                if self.view.frame_ready():
+                    self.board = to_grid(payload["black"], payload["white"])
+                    self.draw_board()
+            elif kind == ERROR:
+                self.toggle_training()
+                messagebox.showerror("Training failed", payload)
                 return
-
-        # Speed of visualization (set to 1 for super fast training)
-        self.master.after(50, self.run_match)
+        self.master.after(POLL_MS, self.poll_training, job)
 
     def choose_best_move(self, moves):
         # Epsilon-greedy: 10% chance to explore randomly to find new strategies
-        if random.random() < 0.1:
-            return random.choice(moves)
-        
-        best_score = -float('inf')
-        best_moves = []
-        for r, c in moves:
-            score = self.position_values[r][c]
-            if score > best_score:
-                best_score = score
-                best_moves = [(r, c)]
-            elif score == best_score:
-                best_moves.append((r, c))
-        return random.choice(best_moves)
+        sq = othello_learner.choose_best_move(self.position_values, [r * 8 + c for r, c in moves])
+        return sq >> 3, sq & 7
 
     def learn_from_result(self):
         b_count = sum(row.count(BLACK) for row in self.board)
         w_count = sum(row.count(WHITE) for row in self.board)
-        
-        if b_count > w_count:
-            winner, loser = BLACK, WHITE
-        elif w_count > b_count:
-            winner, loser = WHITE, BLACK
-        else:
-            return # Draw - no learning today
-
-        # Reward the winner's moves
-        for r, c in self.history[winner]:
-            self.position_values[r][c] += 0.1
-        
-        # Penalize the loser's moves
-        for r, c in self.history[loser]:
-            self.position_values[r][c] -= 0.1
+        history = {p: [r * 8 + c for r, c in moves] for p, moves in self.history.items()}
+        othello_learner.learn_from_result(self.position_values, history, b_count, w_count, self.augment.get())
 
     def draw_board(self):
-        self.canvas.delete("all")
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                x, y = c*SQUARE_SIZE, r*SQUARE_SIZE
-                self.canvas.create_rectangle(x, y, x+SQUARE_SIZE, y+SQUARE_SIZE, outline="black")
-                if self.board[r][c] != EMPTY:
-                    color = "black" if self.board[r][c] == BLACK else "white"
-                    self.canvas.create_oval(x+2, y+2, x+SQUARE_SIZE-2, y+SQUARE_SIZE-2, fill=color)
+        self.view.draw(*from_grid(self.board, BLACK))
 
     def apply_move(self, board, r, c, p):
-        opp = 3 - p
+        own, opp = from_grid(board, p)
         board[r][c] = p
-        for dr, dc in [(0,1),(0,-1),(1,0),(-1,0),(1,1),(1,-1),(-1,1),(-1,-1)]:
-            tr, tc, temp = r + dr, c + dc, []
-            while 0 <= tr < 8 and 0 <= tc < 8 and board[tr][tc] == opp:
-                temp.append((tr, tc))
-                tr, tc = tr + dr, tc + dc
-            if 0 <= tr < 8 and 0 <= tc < 8 and board[tr][tc] == p:
-                for fr, fc in temp: board[fr][fc] = p
+        for fr, fc in to_squares(flips(own, opp, r * 8 + c)): board[fr][fc] = p
 
     def get_legal_moves(self, board, p):
-        moves = []
-        for r in range(8):
-            for c in range(8):
-                if board[r][c] == EMPTY:
-                    if self.is_legal(board, r, c, p): moves.append((r, c))
-        return moves
+        return to_squares(legal_moves(*from_grid(board, p)))
 
     def is_legal(self, board, row, col, p):
-        opp = 3 - p
-        for dr, dc in [(0,1),(0,-1),(1,0),(-1,0),(1,1),(1,-1),(-1,1),(-1,-1)]:
-            r, c = row + dr, col + dc
-            found_opp = False
-            while 0 <= r < 8 and 0 <= c < 8 and board[r][c] == opp:
-                r, c = r + dr, c + dc
-                found_opp = True
-            if found_opp and 0 <= r < 8 and 0 <= c < 8 and board[r][c] == p:
-                return True
-        return False
+        own, opp = from_grid(board, p)
+        return bool(flips(own, opp, row * 8 + col))
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,208 @@
+# Append-only game archive: one byte per move plus the final disc counts, written in
+# blocks that each carry a label (where the games came from) and a checksum.
+#
+# File layout (little-endian): "OTHG", u16 version, u16 reserved, then blocks of
+#   "GBLK", u32 games, u32 payload bytes, u32 CRC-32 of the payload, u16 label bytes, label
+#   payload: per game u8 moves, u8 black discs, u8 white discs, one u8 square per move
+# Passes are not stored; replaying the moves shows where they fell. Readers skip a
+# damaged block and pick up again at the next "GBLK"; before appending, a writer cuts
+# the file back to the end of its last intact block, so a block torn by a crash or a
+# terminated job costs only its own games. Writers hold a lock on the file while they
+# append.
+#
+#   python othello_games.py evolver.games           # counts, labels and a sample game
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from othello_core import legal_moves, flips, parse_moves, square_name, START_BLACK, START_WHITE
+
+MAGIC = b"OTHG"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+BLOCK = struct.Struct("<4sIIIH")
+BLOCK_MAGIC = b"GBLK"
+BLOCK_GAMES = 4096  # games buffered per block by GameWriter
+
+try:
+    import fcntl
+    def lock_file(f): fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    def unlock_file(f): fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows: lock the first byte
+    import msvcrt
+    def lock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    def unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _scan(buf, pos):
+    # Intact blocks from byte `pos` on as (payload offset, games, payload bytes, crc,
+    # label), and the end of the last of them. A block that is cut short or fails its
+    # checksum is skipped up to the next block magic, which move bytes (< 64) and disc
+    # counts (<= 64) cannot contain.
+    blocks, end, size = [], pos, len(buf)
+    while pos + BLOCK.size <= size:
+        magic, games, length, crc, label_len = BLOCK.unpack_from(buf, pos)
+        start = pos + BLOCK.size + label_len
+        if magic == BLOCK_MAGIC and start + length <= size and zlib.crc32(buf[start:start + length]) == crc:
+            blocks.append((start, games, length, crc, buf[start - label_len:start].decode(errors="replace")))
+            pos = end = start + length
+        else:
+            pos = buf.find(BLOCK_MAGIC, pos + 1)
+            if pos < 0: break
+    return blocks, end
+
+def _check_header(path, head):
+    if len(head) < HEADER.size or HEADER.unpack(head)[:2] != (MAGIC, VERSION):
+        raise ValueError(f"{path}: not a version {VERSION} game archive")
+
+
+class GameWriter:
+    def __init__(self, path, label="", block_games=BLOCK_GAMES):
+        self.path, self.label, self.block_games = path, label.encode(), block_games
+        self.payload, self.games = bytearray(), 0
+        self.end = None  # end of the last intact block, as of our last flush
+
+    def add(self, moves, black_discs, white_discs):
+        self.payload += bytes((len(moves), black_discs, white_discs)) + bytes(moves)
+        self.games += 1
+        if self.games >= self.block_games: self.flush()
+
+    def flush(self):
+        if not self.games: return
+        block = BLOCK.pack(BLOCK_MAGIC, self.games, len(self.payload), zlib.crc32(self.payload), len(self.label))
+        with open(self.path, "a+b") as f:
+            lock_file(f)
+            try:
+                self.end = self._intact_end(f)
+                f.write(block + self.label + self.payload)
+                self.end += len(block) + len(self.label) + len(self.payload)
+            finally:
+                unlock_file(f)
+        self.payload, self.games = bytearray(), 0
+
+    def _intact_end(self, f):
+        # Cuts a torn tail off the file; only what was appended since our last flush
+        # needs checking
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER.size:  # new, or torn while its header was written
+            f.truncate(0)
+            f.write(HEADER.pack(MAGIC, VERSION, 0))
+            return HEADER.size
+        f.seek(0)
+        _check_header(self.path, f.read(HEADER.size))
+        end = self.end if self.end and self.end <= size else HEADER.size
+        if end < size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                end = _scan(buf, end)[1]
+            if end < size: f.truncate(end)
+        return end
+
+    close = flush
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameArchive:
+    # Streams or indexes an archive; yields (moves, black discs, white discs) like
+    # the other game sources. Damaged blocks are left out of the index.
+    def __init__(self, path):
+        self.path = path
+        self.blocks = []  # (first game, payload offset, games, payload bytes, crc, label)
+        self.starts = []
+        total = 0
+        with open(path, "rb") as f:
+            _check_header(path, f.read(HEADER.size))
+            size = os.fstat(f.fileno()).st_size
+            found = []
+            if size > HEADER.size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    found = _scan(buf, HEADER.size)[0]
+        for start, games, length, crc, label in found:
+            self.blocks.append((total, start, games, length, crc, label))
+            self.starts.append(total)
+            total += games
+        self.games = total
+        self.skipped = size - HEADER.size - sum(b[3] + BLOCK.size + len(b[5].encode()) for b in self.blocks)  # bytes
+
+    def __len__(self):
+        return self.games
+
+    def _read_block(self, f, block):
+        # The payload, or None if it changed since the index was built
+        _, start, games, length, crc, _ = block
+        f.seek(start)
+        payload = f.read(length)
+        return payload if zlib.crc32(payload) == crc else None
+
+    def __iter__(self):
+        # One block in memory at a time
+        with open(self.path, "rb") as f:
+            for block in self.blocks:
+                payload, pos = self._read_block(f, block), 0
+                if payload is None: continue
+                for _ in range(block[2]):
+                    n, black, white = payload[pos], payload[pos + 1], payload[pos + 2]
+                    yield list(payload[pos + 3:pos + 3 + n]), black, white
+                    pos += 3 + n
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.games: raise IndexError(i)
+        block = self.blocks[bisect.bisect_right(self.starts, i) - 1]
+        with open(self.path, "rb") as f:
+            payload = self._read_block(f, block)
+        if payload is None: raise ValueError(f"{self.path}: damaged block at byte {block[1]}")
+        pos = 0
+        for _ in range(i - block[0]):
+            pos += 3 + payload[pos]
+        n = payload[pos]
+        return list(payload[pos + 3:pos + 3 + n]), payload[pos + 1], payload[pos + 2]
+
+
+def positions(moves):
+    # Replays a game lazily: (side to move, other side, colour to move, square played)
+    # before each move, passes skipped over
+    own, opp, player = START_BLACK, START_WHITE, 1
+    for sq in moves:
+        if not legal_moves(own, opp):
+            own, opp, player = opp, own, 3 - player
+        f = flips(own, opp, sq)
+        if not f: raise ValueError(f"illegal move {square_name(sq)}")
+        yield own, opp, player, sq
+        own, opp, player = opp ^ f, own | f | (1 << sq), 3 - player
+
+def read_match_results(paths):
+    # Games from othello_match.py --out files
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                r = json.loads(line)
+                black, white = (r["a_discs"], r["b_discs"]) if r["a_color"] == "black" else (r["b_discs"], r["a_discs"])
+                yield parse_moves(r["moves"]), black, white
+
+def read_games(paths):
+    # (moves, black discs, white discs) from archives (.games) and match JSONL files
+    for path in paths:
+        if path.endswith(".games"): yield from GameArchive(path)
+        else: yield from read_match_results([path])
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        archive = GameArchive(path)
+        labels = sorted({block[5] for block in archive.blocks})
+        print(f"{path}: {len(archive)} games in {len(archive.blocks)} blocks, labels {labels}")
+        if archive.skipped: print(f"{archive.skipped} damaged bytes skipped")
+        if len(archive):
+            moves, black, white = archive[len(archive) - 1]
+            print(f"last game {black}-{white}: {''.join(square_name(sq) for sq in moves)}")
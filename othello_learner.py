@@ -0,0 +1,187 @@
+# Weight-table learning behind OthelloEvolver, plus a headless self-play trainer
+# that spreads games over worker processes and merges their weight changes.
+#
+#   python othello_learner.py --games 1000000 --jobs 8 --checkpoint 50000
+#   python othello_learner.py --from-games evolver.games   # learn from recorded games instead
+import argparse
+import json
+import os
+import random
+import time
+from multiprocessing import Pool
+import numpy as np
+from othello_core import legal_moves, flips, popcount, squares, START_BLACK, START_WHITE, SYM_SQUARES
+from othello_model import save_weights, load_weights
+from othello_games import GameWriter, positions, read_games
+
+BLACK, WHITE = 1, 2
+KNOWLEDGE_FILE = "knowledge.weights"
+LEGACY_KNOWLEDGE_FILE = "knowledge.json"
+EPSILON = 0.1        # chance of a random move, to explore new strategies
+LEARNING_RATE = 0.1  # added to each winner square, taken from each loser square
+REPORT_INTERVAL = 0.1  # seconds between progress reports of train_job
+AUGMENT = False  # also learn each move's 7 mirror/rotation images
+GAMES_FILE = "evolver.games"  # archive of the self-play games; None keeps none
+
+
+def load_knowledge(path=KNOWLEDGE_FILE):
+    # 8x8 table of square values; flat (neutral) if nothing was saved yet
+    if not os.path.exists(path) and path == KNOWLEDGE_FILE and os.path.exists(LEGACY_KNOWLEDGE_FILE):
+        path = LEGACY_KNOWLEDGE_FILE
+    if not os.path.exists(path):
+        return [[0.0] * 8 for _ in range(8)]
+    if path.endswith(".json"):
+        with open(path) as f:
+            return json.load(f)
+    return load_weights(path)["values"].tolist()
+
+def save_knowledge(values, path=KNOWLEDGE_FILE):
+    save_weights(path, {"values": np.array(values, dtype=float)})
+
+def choose_best_move(values, moves, rng=random):
+    # Epsilon-greedy over squares; ties between equal values are broken at random
+    if rng.random() < EPSILON:
+        return rng.choice(moves)
+    best = max(values[sq >> 3][sq & 7] for sq in moves)
+    return rng.choice([sq for sq in moves if values[sq >> 3][sq & 7] == best])
+
+def learn_from_result(values, history, black_discs, white_discs, augment=AUGMENT):
+    # Reward the winner's squares and penalize the loser's; a draw teaches nothing
+    if black_discs == white_discs: return
+    winner, loser = (BLACK, WHITE) if black_discs > white_discs else (WHITE, BLACK)
+    for player, rate in ((winner, LEARNING_RATE), (loser, -LEARNING_RATE)):
+        for sq in history[player]:
+            for image in ([SYM_SQUARES[k][sq] for k in range(8)] if augment else (sq,)):
+                values[image >> 3][image & 7] += rate
+
+def self_play(values, rng=random):
+    # One game of the table against itself; returns (history, black, white) with the final bitboards
+    own, opp, player = START_BLACK, START_WHITE, BLACK
+    history = {BLACK: [], WHITE: []}
+    passed = False
+    while True:
+        moves = legal_moves(own, opp)
+        if not moves:
+            if passed: break
+            own, opp, player, passed = opp, own, 3 - player, True
+            continue
+        passed = False
+        sq = choose_best_move(values, list(squares(moves)), rng)
+        history[player].append(sq)
+        f = flips(own, opp, sq)
+        own, opp, player = opp ^ f, own | f | (1 << sq), 3 - player
+    black, white = (own, opp) if player == BLACK else (opp, own)
+    return history, black, white
+
+def game_moves(history):
+    # The squares of both players in the order they were played
+    own, opp, player, moves = START_BLACK, START_WHITE, BLACK, []
+    left = {BLACK: iter(history[BLACK]), WHITE: iter(history[WHITE])}
+    for _ in range(len(history[BLACK]) + len(history[WHITE])):
+        if not legal_moves(own, opp):
+            own, opp, player = opp, own, 3 - player
+        sq = next(left[player])
+        moves.append(sq)
+        f = flips(own, opp, sq)
+        own, opp, player = opp ^ f, own | f | (1 << sq), 3 - player
+    return moves
+
+def learn_from_games(values, games, augment=AUGMENT):
+    # learn_from_result over recorded (moves, black discs, white discs); returns the count
+    count = 0
+    for moves, black_discs, white_discs in games:
+        history = {BLACK: [], WHITE: []}
+        for _, _, player, sq in positions(moves): history[player].append(sq)
+        learn_from_result(values, history, black_discs, white_discs, augment)
+        count += 1
+    return count
+
+
+def _train_batch(task):
+    # Learns from `games` games on a private copy; returns the change to the table
+    # and, if asked to keep them, the games as (moves, black discs, white discs)
+    values, games, seed, augment, keep = task
+    rng = random.Random(seed)
+    local = [row[:] for row in values]
+    records = []
+    for _ in range(games):
+        history, black, white = self_play(local, rng)
+        learn_from_result(local, history, popcount(black), popcount(white), augment)
+        if keep: records.append((game_moves(history), popcount(black), popcount(white)))
+    return [[local[r][c] - values[r][c] for c in range(8)] for r in range(8)], games, records
+
+def train(values, games, jobs, batch, checkpoint, path, seed=None, report=print, augment=AUGMENT, archive=None):
+    # Every round hands each worker `batch` games on the current table, then adds
+    # all of their deltas to it. Saves to `path` each `checkpoint` games and appends
+    # the games to the `archive` file if one is given.
+    rng = random.Random(seed)
+    writer = GameWriter(archive, "evolver self-play") if archive else None
+    pool = Pool(jobs) if jobs > 1 else None
+    played, saved_at, start = 0, 0, time.perf_counter()
+    try:
+        while played < games:
+            tasks, left = [], games - played
+            while left and len(tasks) < jobs:
+                n = min(batch, left)
+                tasks.append((values, n, rng.getrandbits(32), augment, bool(writer)))
+                left -= n
+            results = pool.imap_unordered(_train_batch, tasks) if pool else map(_train_batch, tasks)
+            for delta, count, records in results:
+                for r in range(8):
+                    for c in range(8): values[r][c] += delta[r][c]
+                for record in records: writer.add(*record)
+                played += count
+            rate = played / (time.perf_counter() - start)
+            report(f"{played} games, {rate:.0f} games/s")
+            if checkpoint and played - saved_at >= checkpoint:
+                save_knowledge(values, path)
+                saved_at = played
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        save_knowledge(values, path)  # also on Ctrl-C, so an overnight run keeps its progress
+        if writer: writer.close()
+    return values
+
+
+def train_job(_, progress, values, augment=AUGMENT, archive=GAMES_FILE):
+    # othello_worker job for the evolver GUI: learns until cancelled, reporting the
+    # match count, the last final position and the current table
+    writer = GameWriter(archive, "evolver GUI") if archive else None
+    matches, last = 0, time.perf_counter()
+    while True:
+        history, black, white = self_play(values)
+        learn_from_result(values, history, popcount(black), popcount(white), augment)
+        if writer: writer.add(game_moves(history), popcount(black), popcount(white))
+        matches += 1
+        if time.perf_counter() - last >= REPORT_INTERVAL:
+            if writer: writer.flush()  # the job ends by being terminated, so keep no games back
+            progress(matches=matches, black=black, white=white, values=values)
+            last = time.perf_counter()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the evolver's weight table by headless self-play.")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--batch", type=int, default=500, help="games per worker between merges")
+    parser.add_argument("--checkpoint", type=int, default=10000, help="save every this many games")
+    parser.add_argument("--knowledge", default=KNOWLEDGE_FILE)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--augment", action="store_true", help="also learn the 7 symmetric images of every move")
+    parser.add_argument("--archive", default=GAMES_FILE, help="game archive to append to ('' for none)")
+    parser.add_argument("--from-games", nargs="+", metavar="FILE",
+                        help="learn from these archives or match files instead of self-play")
+    args = parser.parse_args(argv)
+    if args.from_games:
+        values = load_knowledge(args.knowledge)
+        count = learn_from_games(values, read_games(args.from_games), args.augment)
+        save_knowledge(values, args.knowledge)
+        print(f"learned from {count} games")
+        return
+    train(load_knowledge(args.knowledge), args.games, args.jobs, args.batch, args.checkpoint,
+          args.knowledge, args.seed, augment=args.augment, archive=args.archive)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+# Headless AI-vs-AI matches: plays N games between two strategies over a process
+# pool, streams one JSON line per game and prints win rate, Elo and ms/move.
+#
+#   python othello_match.py "Alpha-Beta" Evolver -n 200 --time 0.1 --out results.jsonl
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+from othello_core import legal_moves, flips, popcount, squares, to_grid, square_name, parse_moves, START_BLACK, START_WHITE
+from othello_engine import OthelloEngine, STRATEGIES, BLACK, WHITE
+from othello_learner import load_knowledge, KNOWLEDGE_FILE
+from othello_book import OpeningBook, BOOK_FILE
+from othello_games import GameWriter
+from othello_stats import SearchStats
+from othello_server import EngineClient
+from othello_parallel import ParallelSearch
+
+PLAYERS = STRATEGIES + ["Solver", "Evolver", "DeepMind", "Random"]
+BRAIN_FILE = "brain.weights"
+
+
+# --- Players: choose(own, opp, player) returns a square of legal_moves(own, opp) ---
+class EnginePlayer:
+    def __init__(self, strategy, time_budget, stats_log=None, parallel=None):
+        self.strategy = "Alpha-Beta + Solver" if strategy == "Solver" else strategy
+        self.time_budget = time_budget
+        self.engine = OthelloEngine()
+        self.engine.book = None  # the match runner decides who gets the opening book
+        if stats_log: self.engine.stats = SearchStats(stats_log)
+        self.engine.parallel = parallel  # an othello_parallel.ParallelSearch, shared by the players
+
+    def choose(self, own, opp, player):
+        black, white = (own, opp) if player == BLACK else (opp, own)
+        self.engine.board = to_grid(black, white)
+        r, c = self.engine.think(player, self.strategy, self.time_budget)
+        return r * 8 + c
+
+class WeightTablePlayer:
+    # Greedy on an 8x8 table of square values, such as the evolver's (no exploration)
+    def __init__(self, values):
+        self.values = [v for row in values for v in row]
+
+    def choose(self, own, opp, player):
+        moves = list(squares(legal_moves(own, opp)))
+        best = max(self.values[sq] for sq in moves)
+        return random.choice([sq for sq in moves if self.values[sq] == best])
+
+class NetworkPlayer:
+    # Minimax over the net's ratings of the positions `depth` plies ahead
+    def __init__(self, path, depth=1):
+        from othello_nn import SimpleDeepMind, choose_move  # NumPy only when a net plays
+        self.nn = SimpleDeepMind()
+        self.depth = depth
+        self.choose_move = choose_move
+        if not self.nn.load_brain(path, shared=True):
+            print(f"{path} not found, using an untrained net", file=sys.stderr)
+
+    def choose(self, own, opp, player):
+        return self.choose_move(self.nn, own, opp, self.depth)
+
+class RandomPlayer:
+    def choose(self, own, opp, player):
+        return random.choice(list(squares(legal_moves(own, opp))))
+
+class BookPlayer:
+    # Plays opening book moves while there are any, then defers to `player`
+    def __init__(self, player, book):
+        self.player, self.book = player, book
+
+    def choose(self, own, opp, player):
+        sq = self.book.choose(own, opp)
+        if sq is not None and legal_moves(own, opp) >> sq & 1: return sq
+        return self.player.choose(own, opp, player)
+
+def make_player(name, time_budget, knowledge=KNOWLEDGE_FILE, brain=BRAIN_FILE, net_depth=1, opening_book=None,
+                stats_log=None, ponder=False, parallel=None):
+    if name == "Evolver": player = WeightTablePlayer(load_knowledge(knowledge))
+    elif name == "DeepMind": player = NetworkPlayer(brain, net_depth)
+    elif name == "Random": player = RandomPlayer()
+    elif ponder: player = EngineClient(name, time_budget, stats_log=stats_log)
+    else: player = EnginePlayer(name, time_budget, stats_log, parallel)
+    return BookPlayer(player, OpeningBook(opening_book)) if opening_book else player
+
+
+# --- Playing games ---
+def play_game(black_player, white_player, opening=()):
+    # Returns (black discs, white discs, moves played and seconds used per colour,
+    # every square played including the opening)
+    own, opp, player = START_BLACK, START_WHITE, BLACK
+    for sq in opening:
+        if not legal_moves(own, opp):
+            own, opp, player = opp, own, 3 - player
+        f = flips(own, opp, sq)
+        if not f: raise ValueError(f"illegal opening move {square_name(sq)}")
+        own, opp, player = opp ^ f, own | f | (1 << sq), 3 - player
+    record = list(opening)
+
+    players = {BLACK: black_player, WHITE: white_player}
+    used = {BLACK: 0.0, WHITE: 0.0}
+    counts = {BLACK: 0, WHITE: 0}
+    passed = False
+    while True:
+        if not legal_moves(own, opp):
+            if passed: break
+            own, opp, player, passed = opp, own, 3 - player, True
+            continue
+        passed = False
+        start = time.perf_counter()
+        sq = players[player].choose(own, opp, player)
+        used[player] += time.perf_counter() - start
+        counts[player] += 1
+        record.append(sq)
+        f = flips(own, opp, sq)
+        own, opp, player = opp ^ f, own | f | (1 << sq), 3 - player
+
+    black, white = (own, opp) if player == BLACK else (opp, own)
+    return popcount(black), popcount(white), counts, used, record
+
+_players = None
+_parallel = None
+_seed = None
+
+def _init_worker(config):
+    global _players, _parallel, _seed
+    seed, names, time_budget, knowledge, brain, net_depth, opening_book, stats_log, ponder, workers = config
+    random.seed(seed)
+    _seed = seed
+    _parallel = ParallelSearch(workers) if workers else None
+    _players = [make_player(name, time_budget, knowledge, brain, net_depth, opening_book, stats_log, ponder, _parallel)
+                for name in names]
+
+def ponder_counts(player):
+    # (hits, misses) so far of a pondering player, else None
+    player = getattr(player, "player", player)  # inside a BookPlayer
+    return (player.hits, player.misses) if isinstance(player, EngineClient) else None
+
+def _run_game(task):
+    index, opening, a_is_black = task
+    random.seed(f"{_seed}/{index}")  # a game's random choices depend on --seed, not on the worker playing it
+    a, b = _players
+    black, white = (a, b) if a_is_black else (b, a)
+    before = [ponder_counts(p) for p in _players]
+    black_discs, white_discs, counts, used, record = play_game(black, white, opening)
+    discs = {BLACK: black_discs, WHITE: white_discs}
+    a_col, b_col = (BLACK, WHITE) if a_is_black else (WHITE, BLACK)
+    a_discs, b_discs = discs[a_col], discs[b_col]
+    result = {
+        "game": index,
+        "opening": "".join(square_name(sq) for sq in opening),
+        "a_color": "black" if a_is_black else "white",
+        "a_discs": a_discs,
+        "b_discs": b_discs,
+        "score": 1.0 if a_discs > b_discs else 0.0 if a_discs < b_discs else 0.5,
+        "a_moves": counts[a_col], "b_moves": counts[b_col],
+        "a_seconds": round(used[a_col], 4), "b_seconds": round(used[b_col], 4),
+        "moves": "".join(square_name(sq) for sq in record),
+    }
+    for side, player, start in zip("ab", _players, before):
+        if start:
+            hits, misses = ponder_counts(player)
+            result[f"{side}_ponder_hits"], result[f"{side}_ponder_misses"] = hits - start[0], misses - start[1]
+    return result
+
+
+# --- Openings and statistics ---
+def random_opening(rng, plies):
+    own, opp, moves = START_BLACK, START_WHITE, []
+    for _ in range(plies):
+        legal = list(squares(legal_moves(own, opp)))
+        if not legal: break
+        sq = rng.choice(legal)
+        f = flips(own, opp, sq)
+        own, opp = opp ^ f, own | f | (1 << sq)
+        moves.append(sq)
+    return moves
+
+def make_tasks(games, rng, plies, book=None):
+    # Every opening is played twice with the colours swapped
+    tasks = []
+    for i in range(0, games, 2):
+        opening = book[(i // 2) % len(book)] if book else random_opening(rng, plies)
+        tasks.append((i, opening, True))
+        if i + 1 < games: tasks.append((i + 1, opening, False))
+    return tasks
+
+def elo(score):
+    if score <= 0: return -float("inf")
+    if score >= 1: return float("inf")
+    return -400 * math.log10(1 / score - 1) + 0.0  # + 0.0 turns -0.0 into 0.0
+
+def summarize(name_a, name_b, results):
+    n = len(results)
+    if not n:
+        print(f"{name_a} vs {name_b}: no games")
+        return
+    wins = sum(r["score"] == 1.0 for r in results)
+    draws = sum(r["score"] == 0.5 for r in results)
+    score = sum(r["score"] for r in results) / n
+    # 95% interval from the per-game score deviation
+    sd = math.sqrt(sum((r["score"] - score) ** 2 for r in results) / n)
+    margin = 1.96 * sd / math.sqrt(n)
+    ms_a = 1000 * sum(r["a_seconds"] for r in results) / max(1, sum(r["a_moves"] for r in results))
+    ms_b = 1000 * sum(r["b_seconds"] for r in results) / max(1, sum(r["b_moves"] for r in results))
+    print(f"{name_a} vs {name_b}: {n} games, +{wins} ={draws} -{n - wins - draws}")
+    print(f"score {100 * score:.1f}%  Elo {elo(score):+.0f} "
+          f"[{elo(score - margin):+.0f}, {elo(score + margin):+.0f}]")
+    print(f"ms/move: {name_a} {ms_a:.1f}, {name_b} {ms_b:.1f}")
+    rates = []
+    for side, name in (("a", name_a), ("b", name_b)):
+        if f"{side}_ponder_hits" not in results[0]: continue
+        hits = sum(r[f"{side}_ponder_hits"] for r in results)
+        tries = hits + sum(r[f"{side}_ponder_misses"] for r in results)
+        rates.append(f"{name} {hits}/{tries} ({100 * hits / max(1, tries):.0f}%)")
+    if rates: print("ponder hits: " + ", ".join(rates))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play headless Othello matches between two players.")
+    parser.add_argument("a", choices=PLAYERS)
+    parser.add_argument("b", choices=PLAYERS)
+    parser.add_argument("-n", "--games", type=int, default=100)
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--time", type=float, default=0.1, help="seconds per move for the search players")
+    parser.add_argument("--plies", type=int, default=4, help="random opening length")
+    parser.add_argument("--book", help="file of openings, one move string (e.g. f5d6c3) per line")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="JSONL file receiving one line per game")
+    parser.add_argument("--archive", help="game archive (.games) to append the games to")
+    parser.add_argument("--knowledge", default=KNOWLEDGE_FILE)
+    parser.add_argument("--brain", default=BRAIN_FILE)
+    parser.add_argument("--net-depth", type=int, default=1, help="plies the DeepMind player searches")
+    parser.add_argument("--opening-book", default=BOOK_FILE, help="othello_book.py book both players consult")
+    parser.add_argument("--no-book", action="store_true", help="always search, even in book positions")
+    parser.add_argument("--stats", help="JSONL file receiving the search statistics of every engine move")
+    parser.add_argument("--parallel", type=int, default=0, metavar="N",
+                        help="search players share root moves over N processes (with -j 1)")
+    parser.add_argument("--ponder", action="store_true",
+                        help="engine players run in othello_server.py processes and think on the opponent's time")
+    args = parser.parse_args(argv)
+    if args.games < 1: parser.error("-n must be at least 1")
+    if args.parallel and args.jobs > 1: parser.error("--parallel needs -j 1: pool workers cannot start processes")
+    if args.parallel and args.ponder: parser.error("--parallel and --ponder do not combine")
+    if args.ponder:
+        # Each game then has two engines searching at once
+        cap = max(1, os.cpu_count() // 2)
+        if args.jobs > cap:
+            print(f"--ponder: running {cap} games at a time, two search processes each", file=sys.stderr)
+            args.jobs = cap
+
+    book = None
+    if args.book:
+        with open(args.book) as f:
+            book = [parse_moves(line) for line in f if line.strip()]
+    tasks = make_tasks(args.games, random.Random(args.seed), args.plies, book)
+    opening_book = None if args.no_book else args.opening_book
+    config = (args.seed, (args.a, args.b), args.time, args.knowledge, args.brain, args.net_depth, opening_book,
+              args.stats, args.ponder, args.parallel)
+
+    out = open(args.out, "w") if args.out else None
+    writer = GameWriter(args.archive, f"match {args.a} vs {args.b}") if args.archive else None
+    results = []
+    try:
+        if args.jobs <= 1:
+            _init_worker(config)
+            stream = map(_run_game, tasks)
+            pool = None
+        else:
+            pool = Pool(args.jobs, _init_worker, (config,))
+            stream = pool.imap_unordered(_run_game, tasks)
+        for result in stream:
+            result["a"], result["b"] = args.a, args.b
+            results.append(result)
+            if writer:
+                black, white = (result["a_discs"], result["b_discs"]) if result["a_color"] == "black" else (result["b_discs"], result["a_discs"])
+                writer.add(parse_moves(result["moves"]), black, white)
+            if out:
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+        if pool:
+            pool.close()
+            pool.join()
+    finally:
+        if out: out.close()
+        if writer: writer.close()
+        if _parallel: _parallel.close()
+    summarize(args.a, args.b, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# Binary weight files for the evolver table and the DeepMind net.
+#
+# Layout (little-endian):
+#   header  magic "OTHW", u16 version, u16 array count, u32 CRC-32 of everything after the index
+#   index   per array: 16-byte name, 8-byte NumPy dtype string, u8 ndim, u32 per dim, u64 offset
+#   data    each array C-ordered at a 64-byte aligned offset from the start of the file
+#
+# Loading maps the file read-only, so worker processes share one copy of the weights.
+#
+#   python othello_model.py knowledge.json brain_data.json   # one-shot conversion
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+import numpy as np
+
+MAGIC = b"OTHW"
+VERSION = 1
+ALIGN = 64
+HEADER = struct.Struct("<4sHHI")
+ENTRY = struct.Struct("<16s8sB")
+
+
+class ModelFormatError(ValueError):
+    pass
+
+
+def _align(n):
+    return -(-n // ALIGN) * ALIGN
+
+def save_weights(path, arrays):
+    # arrays: {name: array}. Written beside `path` and renamed over it, so readers
+    # only ever see a complete file.
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    start = _align(HEADER.size + sum(ENTRY.size + 4 * a.ndim + 8 for a in arrays.values()))
+    index, data, offset = b"", bytearray(), start
+    for name, a in arrays.items():
+        index += ENTRY.pack(name.encode(), a.dtype.str.encode(), a.ndim)
+        index += struct.pack(f"<{a.ndim}I", *a.shape) + struct.pack("<Q", offset)
+        data += a.tobytes()
+        data += bytes(_align(len(data)) - len(data))
+        offset = start + len(data)
+    head = HEADER.pack(MAGIC, VERSION, len(arrays), zlib.crc32(data)) + index
+
+    tmp = f"{path}.{os.getpid()}.tmp"  # per process: a GUI and its worker may both save
+    with open(tmp, "wb") as f:
+        f.write(head + bytes(start - len(head)) + data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def load_weights(path, shared=True):
+    # Returns {name: array}. shared=True maps the file (read-only arrays); otherwise
+    # the arrays are private, writable copies.
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if shared else f.read()
+    if len(buf) < HEADER.size:
+        raise ModelFormatError(f"{path}: truncated header")
+    magic, version, count, crc = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ModelFormatError(f"{path}: not a weight file")
+    if version != VERSION:
+        raise ModelFormatError(f"{path}: unsupported version {version}")
+
+    pos, entries = HEADER.size, []
+    for _ in range(count):
+        name, dtype, ndim = ENTRY.unpack_from(buf, pos)
+        pos += ENTRY.size
+        shape = struct.unpack_from(f"<{ndim}I", buf, pos)
+        pos += 4 * ndim
+        (offset,) = struct.unpack_from("<Q", buf, pos)
+        pos += 8
+        entries.append((name.rstrip(b"\0").decode(), np.dtype(dtype.rstrip(b"\0").decode()), shape, offset))
+    if zlib.crc32(memoryview(buf)[_align(pos):]) != crc:
+        raise ModelFormatError(f"{path}: checksum mismatch")
+
+    arrays = {}
+    for name, dtype, shape, offset in entries:
+        a = np.frombuffer(buf, dtype, int(np.prod(shape)), offset).reshape(shape)
+        arrays[name] = a if shared else a.copy()
+    return arrays
+
+
+def convert_json(path):
+    # knowledge.json -> knowledge.weights, brain_data.json -> brain.weights
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        out = os.path.join(os.path.dirname(path), "brain.weights")
+        save_weights(out, {"w_ih": np.array(data["w_ih"], dtype=float), "w_ho": np.array(data["w_ho"], dtype=float)})
+    else:
+        out = os.path.splitext(path)[0] + ".weights"
+        save_weights(out, {"values": np.array(data, dtype=float)})
+    return out
+
+if __name__ == "__main__":
+    for p in sys.argv[1:]:
+        print(f"{p} -> {convert_json(p)}")
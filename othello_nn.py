@@ -0,0 +1,226 @@
+import argparse
+import random
+import json
+import os
+import time
+import numpy as np
+from othello_core import legal_moves, flips, popcount, squares, START_BLACK, START_WHITE, SYM_SQUARES, SYM_INVERSE
+from othello_model import save_weights, load_weights
+from othello_games import GameWriter, positions, read_games
+
+BRAIN_FILE = "brain.weights"
+LEGACY_BRAIN_FILE = "brain_data.json"
+EPSILON = 0.1  # chance of a random move during self-play
+AUTOSAVE_EVERY = 100  # train_job saves the brain after this many matches
+REPORT_INTERVAL = 0.1  # seconds between progress reports of train_job
+AUGMENT = False  # also train on the 7 mirror/rotation images of every state
+REPLAY = False  # train on minibatches drawn from replay.buffer instead of only the last game
+GAMES_FILE = "deepmind.games"  # archive of the self-play games; None keeps none
+
+# SYM_COLUMNS[k]: input columns that rearrange a board into its image under symmetry k
+SYM_COLUMNS = np.array([SYM_SQUARES[SYM_INVERSE[k]] for k in range(8)])
+
+# --- Neural Network Engine with Save/Load ---
+# Weights are NumPy arrays; a batch is a (n, input_size) array of boards.
+class SimpleDeepMind:
+    def __init__(self, input_size=64, hidden_size=32, learning_rate=0.01, batch_size=32):
+        self.input_size = input_size
+        self.hidden_size = hidden_size
+        self.w_input_hidden = np.array([[random.uniform(-0.1, 0.1) for _ in range(hidden_size)] for _ in range(input_size)])
+        self.w_hidden_output = np.array([random.uniform(-0.1, 0.1) for _ in range(hidden_size)])
+        self.learning_rate = learning_rate
+        self.batch_size = batch_size  # samples per train_batch step when callers split their data
+
+    def sigmoid(self, x):
+        return 1 / (1 + np.exp(-np.clip(x, -50, 50)))
+
+    def sigmoid_derivative(self, x):
+        return x * (1 - x)
+
+    def predict_batch(self, boards):
+        # Returns (outputs of shape (n,), hidden activations of shape (n, hidden_size))
+        hidden = self.sigmoid(np.asarray(boards, dtype=float) @ self.w_input_hidden)
+        return self.sigmoid(hidden @ self.w_hidden_output), hidden
+
+    def predict(self, inputs):
+        output, hidden = self.predict_batch([inputs])
+        return float(output[0]), hidden[0]
+
+    def train_batch(self, states, targets):
+        # One gradient step summed over the batch, so a batch of one is exactly train()
+        states = np.asarray(states, dtype=float)
+        prediction, hidden = self.predict_batch(states)
+        output_delta = (np.asarray(targets, dtype=float) - prediction) * self.sigmoid_derivative(prediction)
+        hidden_deltas = np.outer(output_delta, self.w_hidden_output) * self.sigmoid_derivative(hidden)
+        # Rebinding (not +=) lets a net loaded from a shared, read-only mapping still train
+        self.w_hidden_output = self.w_hidden_output + self.learning_rate * (output_delta @ hidden)
+        self.w_input_hidden = self.w_input_hidden + self.learning_rate * (states.T @ hidden_deltas)
+
+    def train(self, inputs, target):
+        self.train_batch([inputs], [target])
+
+    # 重みデータを保存
+    def save_brain(self, filename=BRAIN_FILE):
+        save_weights(filename, {"w_ih": self.w_input_hidden, "w_ho": self.w_hidden_output})
+        print(f"Brain saved to {filename}")
+
+    # 重みデータを読み込み (shared=True はファイルを読み取り専用でマップし、プロセス間で共有)
+    def load_brain(self, filename=BRAIN_FILE, shared=False):
+        if not os.path.exists(filename) and filename == BRAIN_FILE and os.path.exists(LEGACY_BRAIN_FILE):
+            filename = LEGACY_BRAIN_FILE
+        if not os.path.exists(filename):
+            return False
+        if filename.endswith(".json"):
+            with open(filename, "r") as f:
+                data = json.load(f)
+            data = {k: np.array(v, dtype=float) for k, v in data.items()}
+        else:
+            data = load_weights(filename, shared)
+        self.w_input_hidden = data["w_ih"]
+        self.w_hidden_output = data["w_ho"]
+        print(f"Brain loaded from {filename}")
+        return True
+
+
+# --- Move choice: every leaf of a shallow tree goes through one predict_batch ---
+def encode(owns, opps):
+    # Bitboard pairs -> (n, 64) inputs with +1 for `own` discs and -1 for `opp` discs
+    own_bits = np.unpackbits(np.array(owns, dtype="<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    opp_bits = np.unpackbits(np.array(opps, dtype="<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    return own_bits.astype(float) - opp_bits
+
+def _expand(own, opp, depth, mine, leaves):
+    # Tree node: leaf index, or (maximizing, children). `own` is the side to move and
+    # `mine` says whether that is the player choosing; leaves are stored as (side to
+    # move, other side, mine), the view the net is trained on.
+    moves = legal_moves(own, opp)
+    if depth and not moves and legal_moves(opp, own):
+        return (mine, [_expand(opp, own, depth, not mine, leaves)])  # pass
+    if depth == 0 or not moves:
+        leaves.append((own, opp, mine))
+        return len(leaves) - 1
+    children = []
+    for sq in squares(moves):
+        f = flips(own, opp, sq)
+        children.append(_expand(opp ^ f, own | f | (1 << sq), depth - 1, not mine, leaves))
+    return (mine, children)
+
+def _backup(node, values):
+    if isinstance(node, int): return values[node]
+    maximizing, children = node
+    scores = [_backup(child, values) for child in children]
+    return max(scores) if maximizing else min(scores)
+
+def choose_move(net, own, opp, depth=1):
+    # Best square for the side to move (`own`) by a depth-ply minimax over net outputs
+    leaves = []
+    moves = list(squares(legal_moves(own, opp)))
+    roots = []
+    for sq in moves:
+        f = flips(own, opp, sq)
+        roots.append(_expand(opp ^ f, own | f | (1 << sq), depth - 1, False, leaves))
+    owns, opps, mine = zip(*leaves)
+    values, _ = net.predict_batch(encode(owns, opps))
+    values = np.where(mine, values, 1 - values)  # the net rates the side to move's chances
+    scores = [_backup(node, values) for node in roots]
+    return moves[scores.index(max(scores))]
+
+
+# --- Self-play training ---
+def self_play(net, depth=1, rng=random):
+    # One epsilon-greedy game of the net against itself. Returns (states, black, white,
+    # movers, moves): the inputs seen by the mover before each of its moves, the final
+    # bitboards, +1/-1 per state for a black/white mover and the squares played.
+    own, opp, black_to_move, passed = START_BLACK, START_WHITE, True, False
+    owns, opps, movers, played = [], [], [], []
+    while True:
+        moves = legal_moves(own, opp)
+        if not moves:
+            if passed: break
+            own, opp, black_to_move, passed = opp, own, not black_to_move, True
+            continue
+        passed = False
+        owns.append(own)
+        opps.append(opp)
+        movers.append(1 if black_to_move else -1)
+        sq = rng.choice(list(squares(moves))) if rng.random() < EPSILON else choose_move(net, own, opp, depth)
+        played.append(sq)
+        f = flips(own, opp, sq)
+        own, opp, black_to_move = opp ^ f, own | f | (1 << sq), not black_to_move
+    black, white = (own, opp) if black_to_move else (opp, own)
+    return encode(owns, opps), black, white, movers, played
+
+def game_states(moves):
+    # (states, movers) of a recorded game, as self_play returns them
+    owns, opps, movers = [], [], []
+    for own, opp, player, _ in positions(moves):
+        owns.append(own)
+        opps.append(opp)
+        movers.append(1 if player == 1 else -1)
+    return encode(owns, opps), movers
+
+def augment_states(states, targets):
+    # All 8 symmetric images of each state, each with its state's target
+    images = np.asarray(states)[:, SYM_COLUMNS].reshape(-1, SYM_COLUMNS.shape[1])
+    return images, np.repeat(targets, len(SYM_COLUMNS))
+
+def learn_from_game(net, states, movers, black_discs, white_discs, augment=AUGMENT):
+    # Each state is a win (1.0), draw (0.5) or loss (0.0) for the side that moved from it
+    targets = (np.sign(black_discs - white_discs) * np.asarray(movers) + 1) / 2
+    if augment: states, targets = augment_states(states, targets)
+    for i in range(0, len(states), net.batch_size):
+        net.train_batch(states[i:i + net.batch_size], targets[i:i + net.batch_size])
+
+def learn_from_games(net, games, augment=AUGMENT):
+    # learn_from_game over recorded (moves, black discs, white discs); returns the count
+    count = 0
+    for moves, black_discs, white_discs in games:
+        if not moves: continue
+        states, movers = game_states(moves)
+        learn_from_game(net, states, movers, black_discs, white_discs, augment)
+        count += 1
+    return count
+
+def train_job(_, progress, w_ih, w_ho, depth=1, augment=AUGMENT, replay=REPLAY, archive=GAMES_FILE):
+    # othello_worker job for the DeepMind GUI: trains until cancelled, saving every
+    # AUTOSAVE_EVERY matches and reporting the count, last final position and weights
+    net = SimpleDeepMind()
+    net.w_input_hidden, net.w_hidden_output = w_ih, w_ho
+    if replay:
+        from othello_replay import ReplayBuffer, game_labels, REPLAY_FILE, REPLAY_BATCHES
+        buffer, rng = ReplayBuffer(path=REPLAY_FILE), np.random.default_rng()
+    writer = GameWriter(archive, "deepmind GUI") if archive else None
+    matches, last = 0, time.perf_counter()
+    while True:
+        states, black, white, movers, moves = self_play(net, depth)
+        if writer: writer.add(moves, popcount(black), popcount(white))
+        if replay:
+            buffer.add_game(states.astype(np.int8), *game_labels(movers, popcount(black), popcount(white)))
+            for _ in range(REPLAY_BATCHES):
+                batch = buffer.batch(net, net.batch_size, rng, augment=augment)
+                if batch: net.train_batch(*batch)
+        else:
+            learn_from_game(net, states, movers, popcount(black), popcount(white), augment)
+        matches += 1
+        if matches % AUTOSAVE_EVERY == 0: net.save_brain()
+        if time.perf_counter() - last >= REPORT_INTERVAL:
+            if writer: writer.flush()  # the job ends by being terminated, so keep no games back
+            progress(matches=matches, black=black, white=white, w_ih=net.w_input_hidden, w_ho=net.w_hidden_output)
+            last = time.perf_counter()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the DeepMind brain on recorded games.")
+    parser.add_argument("--from-games", nargs="+", metavar="FILE", required=True,
+                        help="game archives (.games) or othello_match.py --out files")
+    parser.add_argument("--brain", default=BRAIN_FILE)
+    parser.add_argument("--augment", action="store_true", help="also train on the 7 symmetric images of every state")
+    args = parser.parse_args(argv)
+    net = SimpleDeepMind()
+    net.load_brain(args.brain)
+    count = learn_from_games(net, read_games(args.from_games), args.augment)
+    net.save_brain(args.brain)
+    print(f"trained on {count} games")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# Root-splitting parallel search: the first (previous best) root move is searched
+# in the calling process, then the other moves are shared out to a process pool.
+# Each worker keeps its own OthelloEngine (table, killers, history) and opens its
+# window at the best root score found so far by any process, kept in shared memory.
+# Every move that can still tie the best gets an exact score, so at a fixed depth the
+# best score and best moves are those of the serial search.
+#
+#   python othello_parallel.py --workers 4 --depth 6    # speedup and overhead vs serial
+import argparse
+import multiprocessing as mp
+import os
+import time
+from othello_core import make_move, canonical, legal_moves, squares
+from othello_engine import OthelloEngine, SearchTimeout
+from othello_tt import update_hash, zobrist_hash
+from othello_stats import SearchStats
+
+WORKERS = os.cpu_count()
+
+_engine = None
+_best = None  # shared best root score of the current iteration
+
+def _init_worker(best):
+    global _engine, _best
+    _engine, _best = OthelloEngine(), best
+    _engine.book = None
+
+def _search_move(task):
+    # (square, score or None on timeout, nodes, SearchStats counts or None) for one root move
+    own, opp, player, key, sq, depth, pvs, budget, stats = task
+    e = _engine
+    e.nodes = 0
+    e.stats = SearchStats() if stats else None
+    if stats:
+        e.stats.start(e)
+        e.stats.root_depth = depth  # the child is ply 1, as in the serial search
+    e.deadline = time.perf_counter() + budget if budget is not None else None
+    own, opp, f = make_move(own, opp, sq)
+    child_key = update_hash(key, player, sq, f)
+    e.reset_patterns(own, opp, player)
+    e.tt.new_search()
+    best = _best.value
+    try:
+        # Same windows as search_root: exact for any score that can reach the best
+        if not pvs:
+            score = e.minimax_alpha_beta((own, opp), depth-1, best - 1, float('inf'), False, player, False, child_key)
+        else:
+            score = -e.negamax_pvs(opp, own, depth-1, -best, -best + 1, child_key, 3-player, 1)
+            if score >= best:
+                score = -e.negamax_pvs(opp, own, depth-1, -float('inf'), -best + 1, child_key, 3-player, 1)
+    except SearchTimeout:
+        score = None
+    finally:
+        e.deadline = None
+    if score is not None:
+        with _best.get_lock():
+            if score > _best.value: _best.value = score
+    return sq, score, e.nodes, e.stats.counts(e) if stats else None
+
+
+class ParallelSearch:
+    def __init__(self, workers=WORKERS):
+        self.workers = workers
+        self.best = mp.Value("d", 0.0)
+        self.pool = mp.Pool(workers, _init_worker, (self.best,))
+
+    def search_root(self, engine, own, opp, player, key, depth, order, pvs=False):
+        # Drop-in for engine.search_root at one depth: (best score, best squares, score per square)
+        st = engine.stats
+        if st: st.moves[0] += len(order) - 1  # the root has all its moves, not just the first
+        best_score, _, scores = engine.search_root(own, opp, player, key, depth, False, order[:1], pvs)
+        self.best.value = best_score
+        budget = engine.deadline - time.perf_counter() if engine.deadline else None
+        dedupe = engine.symmetric_eval()
+        image_of = lambda sq: canonical(*make_move(own, opp, sq)[:2])[:2] if dedupe else sq
+        seen, tasks = {image_of(order[0]): order[0]}, []
+        for sq in order[1:]:
+            image = image_of(sq)
+            if image in seen: continue
+            seen[image] = sq
+            tasks.append((own, opp, player, key, sq, depth, pvs, budget, bool(st)))
+        timed_out = False
+        for sq, score, nodes, counts in self.pool.imap_unordered(_search_move, tasks):
+            engine.nodes += nodes
+            if counts: st.merge(counts)
+            if score is None: timed_out = True
+            else: scores[sq] = score
+        if timed_out: raise SearchTimeout
+        for sq in order:
+            if sq not in scores: scores[sq] = scores[seen[image_of(sq)]]
+        best_score = max(scores.values())
+        return best_score, [sq for sq in order if scores[sq] == best_score], scores
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+
+def compare(positions, depth, workers, pvs, report=print):
+    # Fixed-depth searches of each position, serial then parallel: checks the scores
+    # agree and reports speedup (time) and search overhead (nodes)
+    parallel = ParallelSearch(workers)
+    totals = {"serial": [0.0, 0], "parallel": [0.0, 0]}
+    try:
+        for own, opp, player in positions:
+            key = zobrist_hash(*((own, opp) if player == 1 else (opp, own)), player)
+            order = list(squares(legal_moves(own, opp)))
+            results = {}
+            for mode in totals:
+                engine = OthelloEngine()
+                engine.book = None
+                engine.reset_patterns(own, opp, player)
+                start = time.perf_counter()
+                if mode == "serial":
+                    score, moves, _ = engine.search_root(own, opp, player, key, depth, False, order, pvs)
+                else:
+                    score, moves, _ = parallel.search_root(engine, own, opp, player, key, depth, order, pvs)
+                totals[mode][0] += time.perf_counter() - start
+                totals[mode][1] += engine.nodes
+                results[mode] = (score, sorted(moves))
+            if results["serial"] != results["parallel"]:
+                raise RuntimeError(f"parallel search disagrees: {results}")
+    finally:
+        parallel.close()
+    (t_s, n_s), (t_p, n_p) = totals["serial"], totals["parallel"]
+    report(f"serial   {t_s:7.2f}s {n_s:10} nodes")
+    report(f"parallel {t_p:7.2f}s {n_p:10} nodes ({workers} workers)")
+    report(f"speedup {t_s / t_p:.2f}x, search overhead {100 * (n_p / n_s - 1):+.1f}% nodes, scores agree")
+
+
+def main(argv=None):
+    from othello_bench import POSITIONS, position
+    parser = argparse.ArgumentParser(description="Compare parallel and serial fixed-depth searches.")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--pvs", action="store_true", help="PVS instead of plain alpha-beta")
+    args = parser.parse_args(argv)
+    compare([position(m) for m in POSITIONS["midgame"]], args.depth, args.workers, args.pvs)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# Pattern evaluation: the board is read as 46 overlapping lines and corner blocks
+# (every symmetric placement of 11 shapes), each a base-3 index (empty 0, black 1,
+# white 2) into a weight table of its shape. Each game phase has its own tables.
+# The indices are kept up to date as discs are placed and flipped, so evaluating a
+# position is one table lookup per pattern.
+#
+# Weights come from recorded games: every position is fitted to the game's final
+# disc difference.
+#
+#   python othello_match.py PVS PVS -n 2000 --time 0.05 --out games.jsonl
+#   python othello_pattern.py games.jsonl evolver.games --epochs 30
+import argparse
+import os
+from othello_core import make_move, popcount, squares, transform, SYM_SQUARES, START_BLACK, START_WHITE
+from othello_games import positions
+
+PATTERN_FILE = "patterns.weights"
+PHASES = 10       # weight sets over the game, by number of discs
+SCORE_SCALE = 8   # score() units per disc; scores stay integers for the null-window searches
+BLACK, WHITE = 1, 2
+
+# Shapes in one orientation (squares r*8+c); instances are their distinct images
+# under the 8 board symmetries, listed in the transformed order so every instance
+# of a shape reads its squares the same way.
+SHAPES = {
+    "edge+2x": [0, 1, 2, 3, 4, 5, 6, 7, 9, 14],
+    "corner3x3": [0, 1, 2, 8, 9, 10, 16, 17, 18],
+    "corner2x5": [0, 1, 2, 3, 4, 8, 9, 10, 11, 12],
+    "line2": [8, 9, 10, 11, 12, 13, 14, 15],
+    "line3": [16, 17, 18, 19, 20, 21, 22, 23],
+    "line4": [24, 25, 26, 27, 28, 29, 30, 31],
+    "diag8": [0, 9, 18, 27, 36, 45, 54, 63],
+    "diag7": [1, 10, 19, 28, 37, 46, 55],
+    "diag6": [2, 11, 20, 29, 38, 47],
+    "diag5": [3, 12, 21, 30, 39],
+    "diag4": [4, 13, 22, 31],
+}
+
+SHAPE_OFFSET = {}  # where each shape's table starts in a phase's weights
+TABLE_SIZE = 0
+INSTANCES = []     # (shape offset, squares) per pattern
+for name, base in SHAPES.items():
+    SHAPE_OFFSET[name] = TABLE_SIZE
+    TABLE_SIZE += 3 ** len(base)
+    placed = set()
+    for k in range(8):
+        sqs = [SYM_SQUARES[k][sq] for sq in base]
+        if frozenset(sqs) not in placed:
+            placed.add(frozenset(sqs))
+            INSTANCES.append((SHAPE_OFFSET[name], sqs))
+
+# SQUARE_TERMS[sq] = ((pattern, 3 ** digit), ...) for the patterns that read sq
+SQUARE_TERMS = [tuple((i, 3 ** sqs.index(sq)) for i, (_, sqs) in enumerate(INSTANCES) if sq in sqs)
+                for sq in range(64)]
+PHASE_OF = [min(PHASES - 1, max(0, n - 4) * PHASES // 60) for n in range(65)]  # disc count -> phase
+
+
+def pattern_indices(black, white):
+    # Table index of every pattern, computed from scratch
+    indices = []
+    for offset, sqs in INSTANCES:
+        index = 0
+        for sq in reversed(sqs):
+            index = 3 * index + (black >> sq & 1) + 2 * (white >> sq & 1)
+        indices.append(offset + index)
+    return indices
+
+
+class PatternEval:
+    def __init__(self, path=PATTERN_FILE):
+        self.path = path
+        self.tables = None  # one float32 view per phase, mapped on the first load()
+        self.symmetric = False  # the weights score mirror images alike (fitted with augmentation)
+        self.idx = pattern_indices(START_BLACK, START_WHITE)
+        self.discs = 4
+
+    def load(self):
+        # True if weights are available
+        if self.tables is None:
+            self.tables = []
+            if self.path and os.path.exists(self.path):
+                from othello_model import load_weights  # NumPy only when patterns are used
+                arrays = load_weights(self.path)
+                w = arrays["w"]
+                self.symmetric = "symmetric" in arrays and bool(arrays["symmetric"][0])
+                self.tables = [memoryview(w[p]).cast("B").cast("f") for p in range(PHASES)]
+        return bool(self.tables)
+
+    def reset(self, black, white):
+        self.idx = pattern_indices(black, white)
+        self.discs = popcount(black | white)
+
+    def play(self, sq, f, color):
+        # `color` places a disc on sq and turns the discs of f
+        idx = self.idx
+        for i, p in SQUARE_TERMS[sq]: idx[i] += color * p
+        d = 1 if color == WHITE else -1  # a flipped digit goes 1 -> 2 or 2 -> 1
+        for s in squares(f):
+            for i, p in SQUARE_TERMS[s]: idx[i] += d * p
+        self.discs += 1
+
+    def undo(self, sq, f, color):
+        idx = self.idx
+        for i, p in SQUARE_TERMS[sq]: idx[i] -= color * p
+        d = 1 if color == WHITE else -1
+        for s in squares(f):
+            for i, p in SQUARE_TERMS[s]: idx[i] -= d * p
+        self.discs -= 1
+
+    def score(self):
+        # Black's expected final disc lead, in SCORE_SCALE units
+        w = self.tables[PHASE_OF[self.discs]]
+        return int(SCORE_SCALE * sum(map(w.__getitem__, self.idx)))
+
+
+# --- Training ---
+def game_positions(games, augment=True):
+    # (black, white, final black lead) for every position of every game, with its
+    # mirror/rotation images unless augment is False
+    for moves, black_discs, white_discs in games:
+        for own, opp, player, sq in positions(moves):
+            own, opp, _ = make_move(own, opp, sq)
+            black, white = (own, opp) if player == BLACK else (opp, own)
+            images = {(transform(black, k), transform(white, k)) for k in range(8)} if augment else {(black, white)}
+            for b, w in images:
+                yield b, w, black_discs - white_discs
+
+def fit(positions, epochs=20, rate=0.5, report=print):
+    # Gradient descent on squared error; each weight moves by the mean error of the
+    # positions that use it, so rare patterns learn as fast as common ones
+    import numpy as np
+    blacks, whites, targets = (np.array(col, dtype=np.uint64) if i < 2 else np.array(col, dtype=np.float64)
+                               for i, col in enumerate(zip(*positions)))
+    bits = lambda b: np.unpackbits(b.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    digits = bits(blacks).astype(np.int64) + 2 * bits(whites)
+    phase = np.array(PHASE_OF)[digits.astype(bool).sum(1)]
+    cols = []
+    for offset, sqs in INSTANCES:
+        cols.append(offset + digits[:, sqs] @ 3 ** np.arange(len(sqs)) + phase * TABLE_SIZE)
+    features = np.stack(cols, 1).astype(np.int32)  # (positions, patterns) flat indices into all phases' weights
+    counts = np.bincount(features.ravel(), minlength=PHASES * TABLE_SIZE)
+    w = np.zeros(PHASES * TABLE_SIZE)
+    for epoch in range(epochs):
+        err = targets - w[features].sum(1)
+        report(f"epoch {epoch + 1}: {len(targets)} positions, rms error {np.sqrt(np.mean(err ** 2)):.2f} discs")
+        grad = np.bincount(features.ravel(), np.repeat(err, len(INSTANCES)), PHASES * TABLE_SIZE)
+        w += rate * grad / np.maximum(counts, 1) / len(INSTANCES)
+    return w.reshape(PHASES, TABLE_SIZE).astype(np.float32)
+
+
+def main(argv=None):
+    from othello_games import read_games
+    from othello_model import save_weights
+    parser = argparse.ArgumentParser(description="Fit pattern weights to recorded games.")
+    parser.add_argument("files", nargs="+", help="game archives (.games) or othello_match.py JSONL files")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=0.5)
+    parser.add_argument("--no-augment", action="store_true", help="skip the 7 mirror/rotation images")
+    parser.add_argument("--out", default=PATTERN_FILE)
+    args = parser.parse_args(argv)
+
+    positions = list(game_positions(read_games(args.files), not args.no_augment))
+    import numpy as np
+    save_weights(args.out, {"w": fit(positions, args.epochs, args.rate),
+                            "symmetric": np.array([not args.no_augment], np.uint8)})
+    print(f"weights for {len(INSTANCES)} patterns x {PHASES} phases written to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# Perft: counts the leaf positions of the game tree from the start position, as a
+# correctness oracle and throughput benchmark for move generation. A pass counts as
+# a ply and a finished game is a leaf at whatever depth it ends.
+#
+#   python othello_perft.py 9                 # depths 1..9, checked against KNOWN
+#   python othello_perft.py 11 -j 8 --cache   # subtrees over 8 processes, shared counts
+#   python othello_perft.py 6 --divide        # per root move
+#   python othello_perft.py 5 --check         # core vs the front-ends vs a plain grid walk
+import argparse
+import time
+from collections import Counter
+from multiprocessing import Pool
+from othello_core import (legal_moves, flips, canonical, squares, to_grid, from_grid, from_flat, square_name,
+                          START_BLACK, START_WHITE)
+
+# Leaf counts for depths 0..14 from the start (published values, same conventions)
+KNOWN = [1, 4, 12, 56, 244, 1396, 8200, 55092, 390216, 3005288, 24571284, 212258800, 1939886636,
+         18429641748, 184042084512]
+CACHE_DEPTH = 3          # cache subtrees of at least this many plies
+CACHE_LIMIT = 4_000_000  # entries; the cache stops growing beyond this
+SPLIT_DEPTH = 4          # parallel runs hand out the positions this many plies in
+
+
+def perft(own, opp, depth, cache=None, passed=False):
+    # Leaves `depth` plies below (own to move, opp). cache: optional dict shared by
+    # calls, keyed by canonical position and depth, since mirror images count the same
+    if depth == 0: return 1
+    moves = legal_moves(own, opp)
+    if not moves:
+        if passed: return 1  # neither side can move: the game is over
+        return perft(opp, own, depth - 1, cache, True)
+    if cache is not None and depth >= CACHE_DEPTH:
+        key = canonical(own, opp)[:2] + (depth,)
+        count = cache.get(key)
+        if count is not None: return count
+    count = 0
+    if depth == 1:
+        count = bin(moves).count("1")
+    else:
+        while moves:
+            bit = moves & -moves
+            moves ^= bit
+            f = flips(own, opp, bit.bit_length() - 1)
+            count += perft(opp ^ f, own | f | bit, depth - 1, cache)
+    if cache is not None and depth >= CACHE_DEPTH and len(cache) < CACHE_LIMIT: cache[key] = count
+    return count
+
+def frontier(own, opp, depth):
+    # (positions `depth` plies in with how many move orders reach them, leaves of
+    # games already over by then). Positions are canonical and keep their pass flag.
+    level, ended = Counter({(own, opp, False): 1}), 0
+    for _ in range(depth):
+        nxt = Counter()
+        for (own, opp, passed), n in level.items():
+            moves = legal_moves(own, opp)
+            if not moves:
+                if passed: ended += n
+                else: nxt[canonical(opp, own)[:2] + (True,)] += n
+                continue
+            for sq in squares(moves):
+                f = flips(own, opp, sq)
+                nxt[canonical(opp ^ f, own | f | (1 << sq))[:2] + (False,)] += n
+        level = nxt
+    return level, ended
+
+_cache = None
+
+def _init_worker(use_cache):
+    global _cache
+    _cache = {} if use_cache else None
+
+def _perft_task(task):
+    own, opp, passed, depth, n = task
+    return n * perft(own, opp, depth, _cache, passed)
+
+def parallel_perft(own, opp, depth, jobs, use_cache=False):
+    split = min(SPLIT_DEPTH, depth - 1)
+    level, ended = frontier(own, opp, split)
+    tasks = [(o, p, passed, depth - split, n) for (o, p, passed), n in level.items()]
+    tasks.sort(key=lambda t: -t[4])
+    with Pool(jobs, _init_worker, (use_cache,)) as pool:
+        return ended + sum(pool.imap_unordered(_perft_task, tasks, chunksize=4))
+
+def divide(own, opp, depth, cache=None):
+    # {root move: leaves below it}
+    return {sq: perft(opp ^ f, own | f | (1 << sq), depth - 1, cache)
+            for sq in squares(legal_moves(own, opp)) for f in [flips(own, opp, sq)]}
+
+
+# --- Cross-checking the rule implementations ---
+def grid_moves(board, player):
+    # Plain 8-direction walk over the 8x8 list board: the rules with no bit tricks
+    moves = {}
+    for r in range(8):
+        for c in range(8):
+            if board[r][c]: continue
+            turned = []
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    line, rr, cc = [], r + dr, c + dc
+                    while (dr or dc) and 0 <= rr < 8 and 0 <= cc < 8 and board[rr][cc] == 3 - player:
+                        line.append((rr, cc))
+                        rr, cc = rr + dr, cc + dc
+                    if line and 0 <= rr < 8 and 0 <= cc < 8 and board[rr][cc] == player: turned += line
+            if turned: moves[(r, c)] = turned
+    return moves
+
+def check(depth):
+    # Walks the tree to `depth` comparing, at every node, the core's moves and
+    # results with the grid walk and with the rule helpers of the three front-ends
+    # (called on instances built without a window). Returns the number of nodes.
+    from othello import OthelloLab
+    from othello_evolver import OthelloEvolver
+    from othello_deepmind import OthelloDeepMindGUI
+    lab, evolver, deepmind = (object.__new__(cls) for cls in (OthelloLab, OthelloEvolver, OthelloDeepMindGUI))
+    nodes = 0
+
+    def walk(own, opp, player, depth):
+        nonlocal nodes
+        nodes += 1
+        board = to_grid(*((own, opp) if player == 1 else (opp, own)))
+        reference = grid_moves(board, player)
+        core = {(sq >> 3, sq & 7) for sq in squares(legal_moves(own, opp))}
+        flat = [1 if v == 1 else -1 if v == 2 else 0 for row in board for v in row]
+        deepmind.board = flat
+        assert core == set(reference), f"legal moves differ at {board}"
+        assert core == set(lab.get_legal_moves(board, player)) == set(evolver.get_legal_moves(board, player))
+        assert core == {(sq >> 3, sq & 7) for sq in deepmind.get_moves(1 if player == 1 else -1)}
+        if depth == 0: return
+        if not core:
+            if legal_moves(opp, own): walk(opp, own, 3 - player, depth - 1)
+            return
+        for r, c in core:
+            f = flips(own, opp, r * 8 + c)
+            n_own, n_opp = opp ^ f, own | f | (1 << (r * 8 + c))
+            expected = [row[:] for row in board]
+            for rr, cc in reference[(r, c)] + [(r, c)]: expected[rr][cc] = player
+            for apply in (lab.apply_move, evolver.apply_move):
+                b = [row[:] for row in board]
+                apply(b, r, c, player)
+                assert b == expected, f"{apply.__qualname__} differs on {square_name(r * 8 + c)}"
+            deepmind.board = flat[:]
+            deepmind.make_move(r * 8 + c, 1 if player == 1 else -1)
+            assert from_flat(deepmind.board, 1 if player == 1 else -1) == (n_opp, n_own)
+            assert from_grid(expected, 3 - player) == (n_own, n_opp)
+            walk(n_own, n_opp, 3 - player, depth - 1)
+
+    walk(START_BLACK, START_WHITE, 1, depth)
+    return nodes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count leaf positions of the Othello game tree.")
+    parser.add_argument("depth", type=int)
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="processes sharing out the subtrees")
+    parser.add_argument("--cache", action="store_true", help="reuse counts of transposed or mirrored subtrees")
+    parser.add_argument("--divide", action="store_true", help="only the final depth, per root move")
+    parser.add_argument("--check", action="store_true", help="compare all rule implementations instead")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        start = time.perf_counter()
+        print(f"{check(args.depth)} nodes agree ({time.perf_counter() - start:.1f}s)")
+        return
+    if args.divide:
+        counts = divide(START_BLACK, START_WHITE, args.depth, {} if args.cache else None)
+        for sq, n in counts.items():
+            print(f"{square_name(sq)}: {n}")
+        print(f"total: {sum(counts.values())}")
+        return
+    cache = {} if args.cache else None
+    for depth in range(1, args.depth + 1):
+        start = time.perf_counter()
+        if args.jobs > 1 and depth > SPLIT_DEPTH:
+            count = parallel_perft(START_BLACK, START_WHITE, depth, args.jobs, args.cache)
+        else:
+            count = perft(START_BLACK, START_WHITE, depth, cache)
+        elapsed = time.perf_counter() - start
+        status = "" if depth >= len(KNOWN) else "  ok" if count == KNOWN[depth] else f"  MISMATCH, expected {KNOWN[depth]}"
+        print(f"depth {depth:2}: {count:15,} leaves {elapsed:8.2f}s {count / max(elapsed, 1e-9):12,.0f}/s{status}")
+        if status.startswith("  MIS"): raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
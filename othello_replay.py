@@ -0,0 +1,184 @@
+# Experience replay for the DeepMind net: a fixed-capacity ring of self-play states
+# kept as int8 rows (64 bytes a state, plus a result and a flag byte), from which
+# training draws random minibatches. Given a path, the arrays live in a memory-mapped
+# file, so training resumes from it and several self-play processes can fill it.
+#
+# File layout: header "OTHR", u16 version, u16 reserved, u32 capacity, u64 states
+# ever written; then states int8[capacity][64], results int8[capacity], flags u8[capacity]
+# Writers hold a lock on the file while they add a game, and count it only once its
+# rows are in, so readers never sample a row that is still being written.
+#
+#   python othello_replay.py --games 5000 -j 4    # fill replay.buffer with self-play
+#   python othello_replay.py --from-games deepmind.games   # or with recorded games
+import argparse
+import mmap
+import os
+import random
+import struct
+from contextlib import contextmanager, nullcontext
+from multiprocessing import Pool
+import numpy as np
+from othello_nn import SimpleDeepMind, self_play, game_states, SYM_COLUMNS
+from othello_core import popcount
+from othello_games import lock_file, unlock_file
+
+REPLAY_FILE = "replay.buffer"
+REPLAY_CAPACITY = 200_000  # states; the oldest are overwritten first
+REPLAY_BATCHES = 8         # minibatches trained per self-play game
+TD_TARGETS = True          # bootstrap from the net's value of the next state instead of the final result
+
+MAGIC = b"OTHR"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQ")
+WRITTEN = struct.Struct("<Q")  # the header's last field
+LAST, SAME_MOVER = 1, 2  # flags: last state of its game / the next state has the same mover (a pass)
+
+
+def game_labels(movers, black_discs, white_discs):
+    # Per state of one game: the mover's result (1 win, 0 draw, -1 loss) and flags.
+    # movers: +1 where black moved, -1 where white did.
+    movers = np.asarray(movers, dtype=np.int8)
+    results = movers * np.int8(np.sign(black_discs - white_discs))
+    flags = np.zeros(len(movers), np.uint8)
+    flags[:-1][movers[1:] == movers[:-1]] = SAME_MOVER
+    flags[-1] = LAST
+    return results, flags
+
+
+class ReplayBuffer:
+    def __init__(self, capacity=REPLAY_CAPACITY, path=None):
+        self.buf = self.file = None
+        if path:
+            self._open(path, capacity)
+        else:
+            self.capacity, self._written = capacity, 0
+            self.states = np.zeros((capacity, 64), np.int8)
+            self.results = np.zeros(capacity, np.int8)
+            self.flags = np.zeros(capacity, np.uint8)
+
+    def _open(self, path, capacity):
+        # An existing file keeps its own capacity
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, 0, capacity, 0))
+                f.truncate(HEADER.size + capacity * 66)
+        self.file = open(path, "r+b")  # kept open for the lock
+        self.buf = mmap.mmap(self.file.fileno(), 0)
+        magic, version, _, self.capacity, _ = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} replay buffer")
+        n = self.capacity
+        self.states = np.frombuffer(self.buf, np.int8, n * 64, HEADER.size).reshape(n, 64)
+        self.results = np.frombuffer(self.buf, np.int8, n, HEADER.size + n * 64)
+        self.flags = np.frombuffer(self.buf, np.uint8, n, HEADER.size + n * 65)
+
+    @property
+    def written(self):
+        # States ever added, by every process sharing the file
+        return WRITTEN.unpack_from(self.buf, HEADER.size - WRITTEN.size)[0] if self.buf else self._written
+
+    @contextmanager
+    def _locked(self):
+        # Every process writing the file, related or not
+        lock_file(self.file)
+        try: yield
+        finally: unlock_file(self.file)
+
+    def __len__(self):
+        # Rows fully written
+        return min(self.written, self.capacity)
+
+    def add_game(self, states, results, flags):
+        # A whole game at once, so every state but a game's last has its successor
+        # in the next slot
+        states, results, flags = states[-self.capacity:], results[-self.capacity:], flags[-self.capacity:]
+        with self._locked() if self.file else nullcontext():
+            start = self.written
+            slots = (start + np.arange(len(states))) % self.capacity
+            self.states[slots] = states
+            self.results[slots] = results
+            self.flags[slots] = flags
+            if self.buf: WRITTEN.pack_into(self.buf, HEADER.size - WRITTEN.size, start + len(states))
+            else: self._written = start + len(states)
+
+    def batch(self, net, n, rng, td=TD_TARGETS, augment=False):
+        # (inputs, targets) for n random states, or None while the buffer is empty.
+        # Targets are the probability that the state's mover wins: the game result,
+        # or with td the net's view of the next state.
+        if not len(self): return None
+        idx = rng.integers(0, len(self), n)
+        targets = (self.results[idx] + 1) / 2
+        if td:
+            nxt = (idx + 1) % self.capacity
+            value, _ = net.predict_batch(self.states[nxt])
+            value = np.where(self.flags[idx] & SAME_MOVER, value, 1 - value)
+            targets = np.where(self.flags[idx] & LAST, targets, value)
+        inputs = self.states[idx]
+        if augment: inputs = np.take_along_axis(inputs, SYM_COLUMNS[rng.integers(0, 8, n)], 1)
+        return inputs.astype(float), targets
+
+    def close(self):
+        if self.buf:
+            self.states = self.results = self.flags = None
+            self.buf.flush()
+            self.buf.close()
+            self.file.close()
+            self.buf = self.file = None
+
+
+# --- Filling a buffer file from several processes ---
+_buffer = None
+
+def _init_producer(path, seed):
+    global _buffer
+    _buffer = ReplayBuffer(path=path)
+    random.seed(seed ^ os.getpid())
+
+def _produce(task):
+    net, depth = task
+    states, black, white, movers, _ = self_play(net, depth)
+    _buffer.add_game(states.astype(np.int8), *game_labels(movers, popcount(black), popcount(white)))
+    return len(states)
+
+def fill(path, games, jobs, depth=1, capacity=REPLAY_CAPACITY, seed=1, report=print):
+    net = SimpleDeepMind()
+    net.load_brain()
+    ReplayBuffer(capacity, path).close()  # creates the file once, before the producers map it
+    with Pool(jobs, _init_producer, (path, seed)) as pool:
+        total = sum(pool.imap_unordered(_produce, [(net, depth)] * games, chunksize=16))
+    report(f"{games} games, {total} states added to {path}")
+
+def fill_from_games(path, games, capacity=REPLAY_CAPACITY, report=print):
+    # Adds recorded (moves, black discs, white discs) games, e.g. from read_games
+    buffer = ReplayBuffer(capacity, path)
+    count = total = 0
+    try:
+        for moves, black_discs, white_discs in games:
+            if not moves: continue
+            states, movers = game_states(moves)
+            buffer.add_game(states.astype(np.int8), *game_labels(movers, black_discs, white_discs))
+            count, total = count + 1, total + len(movers)
+    finally:
+        buffer.close()
+    report(f"{count} games, {total} states added to {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill a replay buffer file with self-play games.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--depth", type=int, default=1, help="plies searched on top of the net")
+    parser.add_argument("--capacity", type=int, default=REPLAY_CAPACITY, help="states, for a new file")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=REPLAY_FILE)
+    parser.add_argument("--from-games", nargs="+", metavar="FILE",
+                        help="add the games of these archives or match files instead of playing")
+    args = parser.parse_args(argv)
+    if args.from_games:
+        from othello_games import read_games
+        fill_from_games(args.out, read_games(args.from_games), args.capacity)
+        return
+    fill(args.out, args.games, args.jobs, args.depth, args.capacity, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+# Long-lived engine process speaking a line protocol on stdin/stdout, so match
+# managers can drive the engine without Tk. One OthelloEngine serves the whole
+# session and keeps its tables from move to move; told to ponder, it searches the
+# position after the reply it expects while the opponent thinks.
+#
+# Commands, one per line (replies quoted):
+#   othello                          "id name ...", "othellook"
+#   isready                          "readyok"
+#   newgame                          forget the tables of the last game
+#   setoption strategy <name>        one of STRATEGIES (default PVS)
+#   setoption book on|off            opening book moves (default on)
+#   setoption stats <file>|off       append each move's search statistics to a JSONL file
+#   position startpos [moves f5d6c3...]
+#   position <64 of X O -> <X|O>     squares a1 b1 .. h8, then the side to move
+#   go [time <s>] [ponder|infinite]  "info depth .. move .. nodes .. nps ..",
+#                                    then "bestmove <sq>|pass [ponder <sq>]"
+#   ponderhit                        the expected move was played: the ponder search
+#                                    goes on until `time` after it began, so the time
+#                                    pondered counts; it answers at once if that has
+#                                    passed or the search has finished
+#   stop                             answer now with the deepest finished iteration,
+#                                    or the best root move the solver has finished
+#   quit
+#
+# A ponder or infinite search answers only after ponderhit or stop. Searches and the
+# endgame solver stop within about a thousand nodes; Minimax finishes its move.
+#
+#   python othello_server.py
+import os
+import subprocess
+import sys
+import threading
+import time
+from othello_core import legal_moves, make_move, square_name, parse_moves, to_grid, START_BLACK, START_WHITE
+from othello_engine import OthelloEngine, STRATEGIES, TIME_BUDGET, BLACK, WHITE
+from othello_tt import zobrist_hash, update_hash, NO_MOVE
+from othello_book import OpeningBook
+from othello_stats import SearchStats
+
+NAME = "Othello AI Laboratory"
+
+
+def play(own, opp, player, moves):
+    # (side to move, other side, colour to move) after `moves`, passes filled in
+    for sq in moves:
+        if not legal_moves(own, opp):
+            own, opp, player = opp, own, 3 - player
+        if not legal_moves(own, opp) >> sq & 1: raise ValueError(f"illegal move {square_name(sq)}")
+        own, opp, _ = make_move(own, opp, sq)
+        own, opp, player = opp, own, 3 - player
+    return own, opp, player
+
+def board_string(black, white):
+    return "".join("X" if black >> sq & 1 else "O" if white >> sq & 1 else "-" for sq in range(64))
+
+def parse_board(text, side):
+    if len(text) != 64 or set(text) - set("XO-") or side not in ("X", "O"): raise ValueError("bad position")
+    black = sum(1 << sq for sq in range(64) if text[sq] == "X")
+    white = sum(1 << sq for sq in range(64) if text[sq] == "O")
+    return (black, white, BLACK) if side == "X" else (white, black, WHITE)
+
+
+class EngineServer:
+    def __init__(self, out=sys.stdout):
+        self.engine = OthelloEngine()
+        self.out, self.out_lock = out, threading.Lock()
+        self.strategy = "PVS"
+        self.position = (START_BLACK, START_WHITE, BLACK)
+        self.thread = None
+        self.budget = TIME_BUDGET
+        self.pondering = False
+        self.started = 0.0  # when the running search began
+        self.halt = threading.Event()  # the running search's engine.stop_event
+        self.timer = None  # sets halt once a ponder hit's time is up
+        self.release = threading.Event()  # ponderhit or stop: a ponder/infinite search may answer
+
+    def send(self, line):
+        with self.out_lock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    def handle(self, line):
+        # Returns False on quit
+        words = line.split()
+        if not words: return True
+        cmd, args = words[0], words[1:]
+        if cmd == "quit":
+            self.stop()
+            return False
+        if cmd == "othello":
+            self.send(f"id name {NAME}")
+            self.send("option strategy " + "|".join(STRATEGIES))
+            self.send("othellook")
+        elif cmd == "isready":
+            self.send("readyok")
+        elif cmd == "newgame":
+            self.stop()
+            e = self.engine
+            e.tt.clear()
+            e.history = [0] * 64
+        elif cmd == "setoption" and len(args) >= 2:
+            value = " ".join(args[1:])
+            if args[0] == "strategy" and value in STRATEGIES: self.strategy = value
+            elif args[0] == "book" and value in ("on", "off"):
+                self.engine.book = None if value == "off" else self.engine.book or OpeningBook()
+            elif args[0] == "stats": self.engine.stats = None if value == "off" else SearchStats(value)
+            else: self.send(f"info string unknown option {' '.join(args)}")
+        elif cmd == "position" and args:
+            self.stop()
+            try:
+                if args[0] == "startpos":
+                    moves = parse_moves("".join(args[2:])) if args[1:2] == ["moves"] else []
+                    self.position = play(START_BLACK, START_WHITE, BLACK, moves)
+                else:
+                    self.position = parse_board(args[0], args[1] if len(args) > 1 else "")
+            except (ValueError, IndexError) as e:
+                self.send(f"info string {e}")
+        elif cmd == "go":
+            self.go(args)
+        elif cmd == "ponderhit":
+            if self.pondering:
+                self.pondering = False
+                left = self.started + self.budget - time.perf_counter()
+                if left > 0:
+                    self.timer = threading.Timer(left, self.halt.set)
+                    self.timer.daemon = True
+                    self.timer.start()
+                else:
+                    self.halt.set()
+                self.release.set()
+        elif cmd == "stop":
+            self.stop()
+        else:
+            self.send(f"info string unknown command {line.strip()}")
+        return True
+
+    def go(self, args):
+        try:
+            budget = float(args[args.index("time") + 1]) if "time" in args else TIME_BUDGET
+        except (ValueError, IndexError):
+            self.send(f"info string bad time in go {' '.join(args)}")
+            return
+        self.stop()
+        self.budget = budget
+        self.pondering = "ponder" in args
+        wait = self.pondering or "infinite" in args
+        self.release.clear()
+        # A fresh event per search: a late stop or timer can only end the search it was meant for
+        self.halt = self.engine.stop_event = threading.Event()
+        self.started = time.perf_counter()
+        self.thread = threading.Thread(target=self._search, args=(float("inf") if wait else self.budget, wait), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        # Ends a running search; its bestmove is still sent
+        if not (self.thread and self.thread.is_alive()): return
+        self.pondering = False
+        if self.timer: self.timer.cancel()
+        self.halt.set()
+        self.release.set()
+        self.thread.join()
+
+    def _search(self, budget, wait):
+        own, opp, player = self.position
+        e = self.engine
+        e.board = to_grid(*((own, opp) if player == BLACK else (opp, own)))
+        move = e.think(player, self.strategy, budget, self._info)
+        if wait: self.release.wait()
+        if move is None:
+            self.send("bestmove pass")
+            return
+        sq = move[0] * 8 + move[1]
+        reply = self.expected_reply(own, opp, player, sq)
+        self.send(f"bestmove {square_name(sq)}" + (f" ponder {square_name(reply)}" if reply is not None else ""))
+
+    def _info(self, depth, move, nodes, nps, **_):
+        self.send(f"info depth {depth} move {square_name(move[0] * 8 + move[1])} nodes {nodes} nps {nps:.0f}")
+
+    def expected_reply(self, own, opp, player, sq):
+        # The best reply stored in the table for the position after sq, if any
+        key = zobrist_hash(own, opp, player) if player == BLACK else zobrist_hash(opp, own, player)
+        n_own, n_opp, f = make_move(own, opp, sq)
+        entry = self.engine.tt.probe(update_hash(key, player, sq, f))
+        if not entry or entry[3] == NO_MOVE or not legal_moves(n_opp, n_own) >> entry[3] & 1: return None
+        return entry[3]
+
+
+def serve(inp=sys.stdin, out=sys.stdout):
+    server = EngineServer(out)
+    for line in inp:
+        if not server.handle(line): break
+    else:
+        server.stop()  # end of input: the manager went away
+
+
+class EngineClient:
+    # A match player backed by a server process; with ponder it sends the expected
+    # position straight after each answer and the server searches it meanwhile
+    def __init__(self, strategy, time_budget, ponder=True, book=False, stats_log=None):
+        self.time_budget, self.ponder = time_budget, ponder
+        self.proc = subprocess.Popen([sys.executable, __file__], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     text=True, bufsize=1)
+        self.send("setoption strategy " + ("Alpha-Beta + Solver" if strategy == "Solver" else strategy))
+        self.send("setoption book " + ("on" if book else "off"))
+        if stats_log: self.send(f"setoption stats {os.path.abspath(stats_log)}")
+        self.ponder_position = None
+        self.hits = self.misses = 0
+
+    def send(self, line):
+        self.proc.stdin.write(line + "\n")
+        self.proc.stdin.flush()
+
+    def _bestmove(self):
+        # (square or None, expected reply or None)
+        while True:
+            words = self.proc.stdout.readline().split()
+            if not words: raise RuntimeError("engine process ended")
+            if words[0] == "bestmove": break
+        sq = None if words[1] == "pass" else parse_moves(words[1])[0]
+        return sq, parse_moves(words[3])[0] if len(words) > 3 else None
+
+    def _go(self, own, opp, player, ponder=False):
+        black, white = (own, opp) if player == BLACK else (opp, own)
+        self.send(f"position {board_string(black, white)} {'X' if player == BLACK else 'O'}")
+        self.send(f"go time {self.time_budget}" + (" ponder" if ponder else ""))
+
+    def choose(self, own, opp, player):
+        if self.ponder_position:
+            if self.ponder_position == (own, opp, player):
+                self.hits += 1
+                self.send("ponderhit")
+            else:
+                self.misses += 1
+                self.send("stop")
+                self._bestmove()
+                self._go(own, opp, player)
+            self.ponder_position = None
+        else:
+            self._go(own, opp, player)
+        sq, reply = self._bestmove()
+        if self.ponder and reply is not None:
+            # Ponder only a position where we will be to move
+            n_own, n_opp, _ = make_move(own, opp, sq)
+            t = make_move(n_opp, n_own, reply)
+            if legal_moves(t[1], t[0]):
+                self.ponder_position = (t[1], t[0], player)
+                self._go(*self.ponder_position, ponder=True)
+        return sq
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.send("quit")
+            self.proc.wait()
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,193 @@
+# Exact endgame solver: returns the final disc difference (mover minus opponent)
+# under perfect play. Positions are bitboard pairs from othello_core.
+import time
+from othello_core import legal_moves, flips, popcount, squares, FULL
+
+FASTEST_FIRST_EMPTIES = 7  # above this many empties order by opponent mobility
+HASH_EMPTIES = 9           # cache bounds for nodes with at least this many empties
+CHECK_NODES = 1024         # nodes between looks at the deadline and stop event
+
+# Quadrant of each square; parity is a 4-bit mask of quadrants with an odd empty count
+QUADRANT_BIT = [1 << ((r >= 4) * 2 + (c >= 4)) for r in range(8) for c in range(8)]
+QUADRANT_MASKS = [sum(1 << (r * 8 + c) for r in range(8) for c in range(8) if (r >= 4) * 2 + (c >= 4) == q)
+                  for q in range(4)]
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def parity_of(empty):
+    parity = 0
+    for q, mask in enumerate(QUADRANT_MASKS):
+        if popcount(empty & mask) & 1: parity |= 1 << q
+    return parity
+
+
+class EndgameSolver:
+    def __init__(self):
+        self.nodes = 0
+        self.cache = {}
+        self.stats = None  # an othello_stats.SearchStats; nodes with 4 or fewer empties only count as nodes
+        self.deadline = None  # perf_counter() time after which a solve raises SearchTimeout
+        self.stop_event = None  # a threading.Event that does the same once set
+        self.next_check = CHECK_NODES
+        self.complete = True  # False if the last best_moves() ran out of time
+
+    def clear(self):
+        self.cache = {}
+        self.nodes = 0
+        self.next_check = CHECK_NODES
+
+    def _check_time(self):
+        self.next_check = self.nodes + CHECK_NODES
+        if (self.deadline is not None and time.perf_counter() > self.deadline
+                or self.stop_event is not None and self.stop_event.is_set()):
+            raise SearchTimeout
+
+    def solve(self, own, opp, alpha=-64, beta=64):
+        empty = ~(own | opp) & FULL
+        diff = popcount(own) - popcount(opp)
+        return self._search(own, opp, alpha, beta, diff, popcount(empty), parity_of(empty), False)
+
+    def best_moves(self, own, opp):
+        # Returns (score, squares scoring exactly that) for the side to move. Out of
+        # time, the best of the moves solved so far (or the first in order) instead,
+        # with self.complete False.
+        moves = legal_moves(own, opp)
+        empty = ~(own | opp) & FULL
+        n, parity, diff = popcount(empty), parity_of(empty), popcount(own) - popcount(opp)
+        best_score, best = -65, []
+        order = self._order(own, opp, moves, parity, n)
+        if self.stats:
+            self.stats.root_depth = n
+            self.stats.expand(0, len(order))
+        self.complete = False
+        try:
+            for sq in order:
+                f = flips(own, opp, sq)
+                d = diff + 2 * popcount(f) + 1
+                # Window just below the best score keeps ties exact while cutting worse moves
+                score = -self._search(opp ^ f, own | f | (1 << sq), -64, -best_score + 1, -d, n - 1,
+                                      parity ^ QUADRANT_BIT[sq], False)
+                if score > best_score: best_score, best = score, [sq]
+                elif score == best_score: best.append(sq)
+            self.complete = True
+        except SearchTimeout:
+            if not best: best = order[:1]
+        return best_score, best
+
+    def _order(self, own, opp, moves, parity, n):
+        if n > FASTEST_FIRST_EMPTIES:
+            # Fastest first: leave the opponent as few replies as possible
+            scored = []
+            for sq in squares(moves):
+                f = flips(own, opp, sq)
+                mob = popcount(legal_moves(opp ^ f, own | f | (1 << sq)))
+                scored.append((mob, not parity & QUADRANT_BIT[sq], sq))
+            scored.sort()
+            return [sq for _, _, sq in scored]
+        # Region parity: odd quadrants first
+        odd = [sq for sq in squares(moves) if parity & QUADRANT_BIT[sq]]
+        return odd + [sq for sq in squares(moves) if not parity & QUADRANT_BIT[sq]]
+
+    def _search(self, own, opp, alpha, beta, diff, n, parity, passed):
+        self.nodes += 1
+        if self.nodes >= self.next_check: self._check_time()
+        if n <= 4:
+            return self._solve_small(own, opp, alpha, beta, diff, n, parity)
+
+        moves = legal_moves(own, opp)
+        if not moves:
+            if passed: return diff
+            return -self._search(opp, own, -beta, -alpha, -diff, n, parity, True)
+
+        key = None
+        if n >= HASH_EMPTIES:
+            key = (own, opp)
+            entry = self.cache.get(key)
+            if entry:
+                lo, hi = entry
+                if lo >= beta: return lo
+                if hi <= alpha: return hi
+                if lo == hi: return lo
+                alpha, beta = max(alpha, lo), min(beta, hi)
+        alpha0 = alpha
+
+        order = self._order(own, opp, moves, parity, n)
+        st = self.stats
+        if st: st.expand(st.root_depth - n, len(order))
+        best = -65
+        for sq in order:
+            f = flips(own, opp, sq)
+            d = diff + 2 * popcount(f) + 1
+            n_own, n_opp, n_parity = opp ^ f, own | f | (1 << sq), parity ^ QUADRANT_BIT[sq]
+            if best == -65:
+                score = -self._search(n_own, n_opp, -beta, -alpha, -d, n - 1, n_parity, False)
+            else:
+                # Null window first; only a move that beats alpha is searched again
+                score = -self._search(n_own, n_opp, -alpha - 1, -alpha, -d, n - 1, n_parity, False)
+                if alpha < score < beta:
+                    score = -self._search(n_own, n_opp, -beta, -score, -d, n - 1, n_parity, False)
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if st: st.cutoff(sq == order[0])
+                        break
+
+        if key is not None:
+            lo, hi = self.cache.get(key, (-64, 64))
+            if best <= alpha0: hi = min(hi, best)
+            elif best >= beta: lo = max(lo, best)
+            else: lo = hi = best
+            self.cache[key] = (lo, hi)
+        return best
+
+    def _solve_small(self, own, opp, alpha, beta, diff, n, parity):
+        # Last 1-4 empties: walk the empty squares directly instead of generating moves
+        empty = ~(own | opp) & FULL
+        if n == 1:
+            sq = empty.bit_length() - 1
+            f = flips(own, opp, sq)
+            if f: return diff + 2 * popcount(f) + 1
+            f = flips(opp, own, sq)
+            if f: return diff - 2 * popcount(f) - 1
+            return diff
+        if n == 0:
+            return diff
+
+        if parity:
+            sqs = [sq for sq in squares(empty) if parity & QUADRANT_BIT[sq]]
+            sqs += [sq for sq in squares(empty) if not parity & QUADRANT_BIT[sq]]
+        else:
+            sqs = list(squares(empty))
+        best = -65
+        for sq in sqs:
+            f = flips(own, opp, sq)
+            if not f: continue
+            self.nodes += 1
+            d = diff + 2 * popcount(f) + 1
+            score = -self._solve_small(opp ^ f, own | f | (1 << sq), -beta, -alpha, -d, n - 1, parity ^ QUADRANT_BIT[sq])
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta: return best
+        if best > -65: return best
+
+        # Pass: the opponent tries the same squares
+        best = 65
+        for sq in sqs:
+            f = flips(opp, own, sq)
+            if not f: continue
+            self.nodes += 1
+            d = diff - 2 * popcount(f) - 1
+            score = self._solve_small(own ^ f, opp | f | (1 << sq), alpha, beta, d, n - 1, parity ^ QUADRANT_BIT[sq])
+            if score < best:
+                best = score
+                if score < beta:
+                    beta = score
+                    if alpha >= beta: return best
+        return diff if best == 65 else best
@@ -0,0 +1,204 @@
+# Search statistics: what the searches did for one move (nodes, cutoffs, branching
+# factor per ply, transposition table hits, depth) as a summary dict, optionally
+# appended as a JSON line per move. An engine collects them only while engine.stats
+# holds a SearchStats, so with it None the searches pay one attribute test per node.
+#
+#   python othello_stats.py PVS --moves f5d6c3 --time 2 --timing
+#   python othello_stats.py Alpha-Beta --profile move.prof   # cProfile of one move
+#
+# A .prof file opens in snakeviz, or turns into a flame graph with flameprof.
+import argparse
+import cProfile
+import json
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+from othello_core import square_name
+
+STATS_FILE = "search_stats.jsonl"
+MAX_PLY = 64
+
+
+class SearchStats:
+    def __init__(self, log=None, timing=False):
+        self.log = log        # JSONL file receiving each move's summary
+        self.timing = timing  # also time the rules, evaluation and solver (slows the search down)
+        self.last = None      # summary of the last move
+        self.reset()
+
+    def reset(self):
+        self.expanded = [0] * MAX_PLY  # nodes whose moves were searched, per ply from the root
+        self.moves = [0] * MAX_PLY     # legal moves at those nodes
+        self.cutoffs = self.first_cutoffs = self.evals = 0
+        self.merged_probes = self.merged_hits = 0  # TT lookups of other processes' tables
+        self.root_depth = 0            # of the running iteration, to tell the ply from the depth left
+        self.times = dict.fromkeys(TIMED, 0.0)
+
+    # --- Called by the searches ---
+    def expand(self, ply, moves):
+        self.expanded[ply] += 1
+        self.moves[ply] += moves
+
+    def cutoff(self, first):
+        self.cutoffs += 1
+        if first: self.first_cutoffs += 1
+
+    # --- Per move ---
+    def start(self, engine):
+        self.reset()
+        self.tt_probes, self.tt_hits = engine.tt.probes, engine.tt.hits
+
+    def live(self, engine):
+        # Running rates, for progress reports
+        expanded = sum(self.expanded)
+        probes = engine.tt.probes - self.tt_probes + self.merged_probes
+        hits = engine.tt.hits - self.tt_hits + self.merged_hits
+        return {
+            "cutoff_rate": self.cutoffs / expanded if expanded else 0.0,
+            "first_cutoff": self.first_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+            "tt_hit_rate": hits / probes if probes else 0.0,
+        }
+
+    # --- Across processes ---
+    def counts(self, engine):
+        # Counters since start(), for merge() into the stats of another process
+        return {"expanded": self.expanded, "moves": self.moves, "cutoffs": self.cutoffs,
+                "first_cutoffs": self.first_cutoffs, "evals": self.evals,
+                "tt_probes": engine.tt.probes - self.tt_probes, "tt_hits": engine.tt.hits - self.tt_hits}
+
+    def merge(self, counts):
+        for ply in range(MAX_PLY):
+            self.expanded[ply] += counts["expanded"][ply]
+            self.moves[ply] += counts["moves"][ply]
+        self.cutoffs += counts["cutoffs"]
+        self.first_cutoffs += counts["first_cutoffs"]
+        self.evals += counts["evals"]
+        self.merged_probes += counts["tt_probes"]
+        self.merged_hits += counts["tt_hits"]
+
+    def finish(self, engine, strategy, player, sq, seconds, book=False):
+        summary = {
+            "time": round(time.time(), 3), "strategy": strategy, "player": "black" if player == 1 else "white",
+            "move": square_name(sq), "book": book, "depth": engine.last_depth, "nodes": engine.nodes,
+            "seconds": round(seconds, 4), "nps": round(engine.nodes / seconds) if seconds > 0 else 0, "evals": self.evals,
+        }
+        summary.update({k: round(v, 4) for k, v in self.live(engine).items()})
+        summary["branching"] = [round(m / n, 2) for m, n in zip(self.moves, self.expanded) if n]
+        if self.timing: summary["times"] = {k: round(v, 4) for k, v in self.times.items()}
+        self.last = summary
+        if self.log:
+            with open(self.log, "a") as f:
+                f.write(json.dumps(summary) + "\n")
+        return summary
+
+    @contextmanager
+    def timed(self):
+        # With timing on, times the TIMED functions through the interpreter's profile
+        # hook, wherever they are called from, for the duration of the block. A
+        # recursive call counts once, from its outermost entry.
+        if not self.timing:
+            yield
+            return
+        names, entered, clock = _timed_code(), {}, time.perf_counter
+        def hook(frame, event, arg):
+            if event == "call" or event == "return":
+                name = names.get(frame.f_code)
+                if name is None: return
+                if event == "call":
+                    if name not in entered: entered[name] = [clock(), 0]
+                    entered[name][1] += 1
+                else:
+                    t = entered[name]
+                    t[1] -= 1
+                    if not t[1]: self.times[name] += clock() - entered.pop(name)[0]
+        saved = sys.getprofile()
+        sys.setprofile(hook)
+        try:
+            yield
+        finally:
+            sys.setprofile(saved)
+
+
+# Timed groups; they overlap (the solver calls flips, evaluate scores patterns)
+TIMED = {
+    "legal_moves": ("othello_core", "legal_moves"),
+    "flips": ("othello_core", "flips"),
+    "evaluate": ("othello_engine", "OthelloEngine.evaluate"),
+    "pattern_updates": ("othello_pattern", "PatternEval.play", "PatternEval.undo"),
+    "solver": ("othello_solver", "EndgameSolver.best_moves"),
+}
+
+def _timed_code():
+    # code object -> TIMED group
+    import importlib
+    codes = {}
+    for name, (module, *paths) in TIMED.items():
+        for path in paths:
+            fn = importlib.import_module(module)
+            for attr in path.split("."): fn = getattr(fn, attr)
+            codes[fn.__code__] = name
+    return codes
+
+
+def summary_line(s):
+    # One line for the GUI status label or a console
+    if s["book"]: return f"{s['strategy']} {s['move']}: book move"
+    line = f"{s['strategy']} {s['move']}: depth {s['depth']}, {s['nodes']} nodes, {s['nps']} nps"
+    if s["branching"]:
+        line += f", cut {s['cutoff_rate']:.0%} ({s['first_cutoff']:.0%} first), TT {s['tt_hit_rate']:.0%}"
+    return line
+
+def profile_call(path, fn, *args):
+    # Runs fn(*args) under cProfile and saves the profile to `path`
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn, *args)
+    finally:
+        profiler.dump_stats(path)
+
+
+def main(argv=None):
+    from othello_bench import position
+    from othello_core import to_grid
+    from othello_engine import OthelloEngine, STRATEGIES, TIME_BUDGET
+    parser = argparse.ArgumentParser(description="Search statistics (and optionally a profile) for one move.")
+    parser.add_argument("strategy", choices=STRATEGIES)
+    parser.add_argument("--moves", default="", help="moves from the start, like f5d6c3")
+    parser.add_argument("--time", type=float, default=TIME_BUDGET)
+    parser.add_argument("--timing", action="store_true", help="time the rules, evaluation and solver too")
+    parser.add_argument("--profile", help="save a cProfile of the move to this file")
+    parser.add_argument("--out", help="append the summary to this JSONL file")
+    parser.add_argument("--book", action="store_true", help="let the opening book answer")
+    parser.add_argument("--parallel", type=int, default=0, metavar="N", help="share root moves over N processes")
+    args = parser.parse_args(argv)
+    if args.timing and args.profile: parser.error("--timing and --profile both need the profile hook")
+    if args.timing and args.parallel: parser.error("--timing only sees this process, not --parallel workers")
+
+    own, opp, player = position(args.moves)
+    engine = OthelloEngine()
+    if not args.book: engine.book = None
+    engine.board = to_grid(*((own, opp) if player == 1 else (opp, own)))
+    engine.stats = SearchStats(args.out, args.timing)
+    if args.parallel:
+        from othello_parallel import ParallelSearch
+        engine.parallel = ParallelSearch(args.parallel)
+    try:
+        with engine.stats.timed():
+            if args.profile: profile_call(args.profile, engine.think, player, args.strategy, args.time)
+            else: engine.think(player, args.strategy, args.time)
+    finally:
+        if engine.parallel: engine.parallel.close()
+    s = engine.stats.last
+    if s is None: raise SystemExit("no legal move")
+    print(summary_line(s))
+    if s["book"]: return
+    if s["branching"]: print("branching per ply: " + " ".join(f"{b:g}" for b in s["branching"]))
+    print(f"evaluations: {s['evals']}")
+    if "times" in s:
+        print("seconds in: " + ", ".join(f"{k} {v:.3f}" for k, v in s["times"].items()))
+    if args.profile:
+        pstats.Stats(args.profile).sort_stats("tottime").print_stats(12)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Zobrist hashing and a fixed-size transposition table for the alpha-beta searches.
+import random
+from array import array
+from othello_core import squares
+
+BLACK, WHITE = 1, 2
+EXACT, LOWER, UPPER = 0, 1, 2
+NO_MOVE = 64
+
+_rng = random.Random(20240515)  # fixed seed: keys must be identical across runs and processes
+ZOBRIST = [None, [_rng.getrandbits(64) for _ in range(64)], [_rng.getrandbits(64) for _ in range(64)]]
+ZOBRIST_FLIP = [ZOBRIST[BLACK][i] ^ ZOBRIST[WHITE][i] for i in range(64)]  # toggles a disc's colour
+ZOBRIST_SIDE = _rng.getrandbits(64)   # white to move
+
+def zobrist_hash(black, white, player):
+    h = ZOBRIST_SIDE if player == WHITE else 0
+    zb, zw = ZOBRIST[BLACK], ZOBRIST[WHITE]
+    for sq in squares(black): h ^= zb[sq]
+    for sq in squares(white): h ^= zw[sq]
+    return h
+
+def update_hash(h, player, sq, flipped):
+    # Hash after `player` plays sq turning over `flipped`; also hands the move to the other side
+    h ^= ZOBRIST[player][sq] ^ ZOBRIST_SIDE
+    for s in squares(flipped): h ^= ZOBRIST_FLIP[s]
+    return h
+
+def flip_bound(flag):
+    # A bound seen from the other side of the board
+    return LOWER if flag == UPPER else UPPER if flag == LOWER else flag
+
+
+class TranspositionTable:
+    # One slot per index: a 64-bit key plus a 64-bit packed entry
+    #   bits 0-6 best move (NO_MOVE if none), 7-8 bound, 9-15 depth, 16-23 age, 24+ score
+    ENTRY_BYTES = 16
+
+    def __init__(self, size_mb=16):
+        n = 1
+        while n * 2 * self.ENTRY_BYTES <= size_mb * 1024 * 1024: n *= 2
+        self.size, self.mask = n, n - 1
+        self.keys = array("Q", [0]) * n
+        self.data = array("q", [0]) * n
+        self.age = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.probes = self.hits = self.stores = self.collisions = self.replaced = self.rejected = 0
+
+    def clear(self):
+        self.keys = array("Q", [0]) * self.size
+        self.data = array("q", [0]) * self.size
+        self.age = 0
+        self.reset_stats()
+
+    def new_search(self):
+        # Entries from earlier searches become preferred victims
+        self.age = (self.age + 1) & 255
+
+    def probe(self, key):
+        # Returns (depth, flag, score, move) or None
+        self.probes += 1
+        i = key & self.mask
+        k = self.keys[i]
+        if k != key:
+            if k: self.collisions += 1
+            return None
+        self.hits += 1
+        d = self.data[i]
+        return (d >> 9) & 127, (d >> 7) & 3, d >> 24, d & 127
+
+    def store(self, key, depth, flag, score, move=NO_MOVE):
+        i = key & self.mask
+        k = self.keys[i]
+        if k and k != key:
+            # Depth-preferred, but anything left over from an older search may go
+            old = self.data[i]
+            if (old >> 16) & 255 == self.age and (old >> 9) & 127 > depth:
+                self.rejected += 1
+                return
+            self.replaced += 1
+        self.stores += 1
+        self.keys[i] = key
+        self.data[i] = (int(score) << 24) | (self.age << 16) | (min(depth, 127) << 9) | (flag << 7) | move
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+            "stores": self.stores,
+            "collisions": self.collisions,
+            "replaced": self.replaced,
+            "rejected": self.rejected,
+        }
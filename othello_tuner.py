@@ -0,0 +1,276 @@
+# Population-based tuning of an 8x8 square-value table with CMA-ES. Tables are kept
+# symmetric, so a candidate is just its 10 values (a1 b1 c1 d1 b2 c2 d2 c3 d3 d4).
+# Each generation plays every candidate against a fixed pool of opponents from the
+# same openings, both colours, over a process pool; the state after each generation
+# goes to a checkpoint file, so a stopped run picks up where it left off. The result
+# is the search's mean, scored again on fresh openings: the top candidate of some
+# generation owes much of its fitness to luck in a few dozen games.
+#
+# Two targets: "evolver" plays the table greedily like OthelloEvolver, "engine" uses it
+# as the alpha-beta evaluation (POSITION_VALUES) at a fixed depth.
+#
+#   python othello_tuner.py --target evolver --generations 100 -j 8 --export knowledge.weights
+#   python othello_tuner.py --target engine --depth 2 --log tune.jsonl   # resumes tune.ckpt
+import argparse
+import json
+import math
+import os
+import random
+import time
+from multiprocessing import Pool
+import numpy as np
+from othello_core import legal_moves, popcount, squares, square_name, SYM_SQUARES
+from othello_engine import OthelloEngine, POSITION_VALUES, row_values
+from othello_learner import load_knowledge, save_knowledge, KNOWLEDGE_FILE
+from othello_match import WeightTablePlayer, RandomPlayer, play_game, random_opening
+from othello_tt import zobrist_hash
+
+CHECKPOINT_FILE = "tune.ckpt"
+OPPONENTS = ["Alpha-Beta", "Evolver", "Random"]
+OPENINGS = 8        # random openings per generation, each played with both colours
+FINAL_OPENINGS = 32  # fresh openings on which the final table is scored
+OPENING_PLIES = 4
+DEPTH = 2           # plies searched by the engine target and the Alpha-Beta opponent
+SIGMA = 20.0        # initial step size, in POSITION_VALUES units (corner = 100)
+DISC_WEIGHT = 0.25  # fitness = win rate + this times the mean disc margin / 64
+
+# The 10 squares of one triangle stand for the rest; CLASS_OF[sq] is sq's entry
+BASE_SQUARES = sorted({min(SYM_SQUARES[k][sq] for k in range(8)) for sq in range(64)})
+CLASS_OF = [BASE_SQUARES.index(min(SYM_SQUARES[k][sq] for k in range(8))) for sq in range(64)]
+
+
+def to_table(params):
+    # 8x8 integer table (the searches need integer scores)
+    return [[int(round(params[CLASS_OF[r * 8 + c]])) for c in range(8)] for r in range(8)]
+
+def from_table(table):
+    # The 10 values, each the mean over its symmetric squares
+    sums, counts = [0.0] * len(BASE_SQUARES), [0] * len(BASE_SQUARES)
+    for sq in range(64):
+        sums[CLASS_OF[sq]] += table[sq >> 3][sq & 7]
+        counts[CLASS_OF[sq]] += 1
+    return [s / n for s, n in zip(sums, counts)]
+
+
+class SearchPlayer:
+    # Fixed-depth alpha-beta on a positional table, without book or patterns;
+    # the same search as the OthelloLab players, minus the clock
+    def __init__(self, table, depth=DEPTH):
+        self.engine = OthelloEngine()
+        self.engine.book = self.engine.patterns = None
+        self.depth = depth
+        self.set_table(table)
+
+    def set_table(self, table):
+        # Scores stored under another table would mislead the search
+        self.table = table
+        self.engine.row_values = row_values(table)
+        self.engine.tt.clear()
+
+    def choose(self, own, opp, player):
+        e = self.engine
+        key = zobrist_hash(own, opp, player) if player == 1 else zobrist_hash(opp, own, player)
+        e.tt.new_search()
+        order = list(squares(legal_moves(own, opp)))
+        _, best_moves, _ = e.search_root(own, opp, player, key, min(self.depth, 64 - popcount(own | opp)), False, order)
+        return random.choice(best_moves)
+
+def make_opponent(name, depth, knowledge=KNOWLEDGE_FILE):
+    if name == "Alpha-Beta": return SearchPlayer(POSITION_VALUES, depth)
+    if name == "Evolver": return WeightTablePlayer(load_knowledge(knowledge))
+    if name == "Random": return RandomPlayer()
+    raise ValueError(f"unknown opponent {name}")
+
+
+class CMAES:
+    # Plain CMA-ES (Hansen's defaults), maximizing; the state round-trips through JSON
+    def __init__(self, mean, sigma, popsize=None):
+        n = self.n = len(mean)
+        self.popsize = popsize or 4 + int(3 * math.log(n))
+        mu = self.popsize // 2
+        w = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+        self.weights = w / w.sum()
+        self.mueff = 1 / (self.weights ** 2).sum()
+        self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3) ** 2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2) ** 2 + self.mueff))
+        self.damps = 1 + 2 * max(0, math.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chi_n = math.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n * n))
+        self.mean, self.sigma = np.array(mean, float), sigma
+        self.C, self.pc, self.ps = np.eye(n), np.zeros(n), np.zeros(n)
+        self.generation = 0
+
+    def ask(self, rng):
+        d, B = np.linalg.eigh(self.C)
+        z = rng.standard_normal((self.popsize, self.n))
+        return self.mean + self.sigma * (z * np.sqrt(np.maximum(d, 1e-20))) @ B.T
+
+    def tell(self, xs, fitness):
+        n = self.n
+        best = np.argsort(fitness)[::-1][:len(self.weights)]
+        y = (np.asarray(xs)[best] - self.mean) / self.sigma
+        y_w = self.weights @ y
+        self.mean = self.mean + self.sigma * y_w
+        d, B = np.linalg.eigh(self.C)
+        inv_sqrt = B @ np.diag(1 / np.sqrt(np.maximum(d, 1e-20))) @ B.T
+        self.ps = (1 - self.cs) * self.ps + math.sqrt(self.cs * (2 - self.cs) * self.mueff) * inv_sqrt @ y_w
+        self.generation += 1
+        ps_norm = np.linalg.norm(self.ps)
+        hsig = ps_norm / math.sqrt(1 - (1 - self.cs) ** (2 * self.generation)) / self.chi_n < 1.4 + 2 / (n + 1)
+        self.pc = (1 - self.cc) * self.pc + hsig * math.sqrt(self.cc * (2 - self.cc) * self.mueff) * y_w
+        rank_mu = (self.weights[:, None] * y).T @ y
+        self.C = ((1 - self.c1 - self.cmu) * self.C + self.cmu * rank_mu
+                  + self.c1 * (np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C))
+        self.sigma *= math.exp(self.cs / self.damps * (ps_norm / self.chi_n - 1))
+
+    def state(self):
+        return {"generation": self.generation, "popsize": self.popsize, "sigma": self.sigma,
+                "mean": self.mean.tolist(), "C": self.C.tolist(), "pc": self.pc.tolist(), "ps": self.ps.tolist()}
+
+    @classmethod
+    def from_state(cls, state):
+        es = cls(state["mean"], state["sigma"], state["popsize"])
+        es.generation = state["generation"]
+        es.C, es.pc, es.ps = (np.array(state[k]) for k in ("C", "pc", "ps"))
+        return es
+
+
+# --- Playing a generation over the pool ---
+_opponents = None
+_candidate = None  # the engine target's player, reused from game to game
+
+def _init_worker(config):
+    global _opponents, _candidate
+    seed, names, depth, knowledge = config
+    random.seed(seed ^ os.getpid())
+    _opponents = {name: make_opponent(name, depth, knowledge) for name in names}
+    _candidate = SearchPlayer(POSITION_VALUES, depth)
+
+def _play(task):
+    # Fitness contribution of one game: result plus disc margin, from the candidate's side
+    index, table, target, name, opening, as_black = task
+    if target == "evolver":
+        me = WeightTablePlayer(table)
+    else:
+        me = _candidate
+        if me.table != table: me.set_table(table)
+    other = _opponents[name]
+    black, white, *_ = play_game(*((me, other) if as_black else (other, me)), opening)
+    margin = black - white if as_black else white - black
+    return index, name, (1.0 if margin > 0 else 0.5 if margin == 0 else 0.0) + DISC_WEIGHT * margin / 64
+
+def evaluate(pool, tables, target, opponents, openings):
+    # Mean fitness per table and per (table, opponent); every table meets the same games
+    tasks = [(i, table, target, name, opening, as_black)
+             for i, table in enumerate(tables) for name in opponents for opening in openings for as_black in (True, False)]
+    totals = [dict.fromkeys(opponents, 0.0) for _ in tables]
+    for i, name, value in pool.imap_unordered(_play, tasks, chunksize=4):
+        totals[i][name] += value
+    per_game = 2 * len(openings)
+    by_opponent = [{name: t[name] / per_game for name in opponents} for t in totals]
+    return [sum(b.values()) / len(b) for b in by_opponent], by_opponent, len(tasks)
+
+
+def tune(generations, jobs, target="evolver", depth=DEPTH, opponents=OPPONENTS, openings=OPENINGS,
+         popsize=None, sigma=SIGMA, seed=1, checkpoint=CHECKPOINT_FILE, knowledge=KNOWLEDGE_FILE, log=None, report=print):
+    # Runs up to `generations` in total, continuing from `checkpoint` if it exists.
+    # Returns the final mean as {"table", "scale", "fitness", "vs", "generation"}; the
+    # table is at the search's scale (corner about 100), `scale` the start table's.
+    if checkpoint and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            doc = json.load(f)
+        if doc["target"] != target: raise ValueError(f"{checkpoint} tunes the {doc['target']} target")
+        es, scale = CMAES.from_state(doc["es"]), doc.get("scale", 100)
+        report(f"resuming {checkpoint} at generation {es.generation}")
+    else:
+        start = load_knowledge(knowledge) if target == "evolver" else POSITION_VALUES
+        scale = max(abs(v) for row in start for v in row)
+        if not scale: start, scale = POSITION_VALUES, 100  # a new (flat) evolver table
+        es = CMAES([v * 100 / scale for v in from_table(start)], sigma, popsize)
+    pool = Pool(jobs, _init_worker, ((seed, opponents, depth, knowledge),))
+    try:
+        while es.generation < generations:
+            # Generation g always draws the same candidates and openings, so a resumed run repeats it exactly
+            rng = np.random.default_rng([seed, es.generation])
+            game_rng = random.Random(f"{seed}/{es.generation}")
+            xs = es.ask(rng)
+            tables = [to_table(x) for x in xs]
+            games = [random_opening(game_rng, OPENING_PLIES) for _ in range(openings)]
+            started = time.perf_counter()
+            fitness, by_opponent, played = evaluate(pool, tables, target, opponents, games)
+            elapsed = time.perf_counter() - started
+            top = int(np.argmax(fitness))
+            es.tell(xs, np.array(fitness))
+            entry = {"generation": es.generation, "best": round(fitness[top], 4), "mean": round(float(np.mean(fitness)), 4),
+                     "vs": {k: round(v, 4) for k, v in by_opponent[top].items()}, "sigma": round(es.sigma, 3),
+                     "games": played, "seconds": round(elapsed, 2), "games_per_s": round(played / elapsed, 1)}
+            report(f"gen {entry['generation']:4}  best {entry['best']:.3f}  mean {entry['mean']:.3f}  "
+                   f"sigma {entry['sigma']:6.2f}  {played} games {entry['games_per_s']:.0f}/s  "
+                   + "  ".join(f"{k} {v:.2f}" for k, v in entry["vs"].items()))
+            if log:
+                with open(log, "a") as f:
+                    f.write(json.dumps(entry) + "\n")
+            if checkpoint:
+                tmp = f"{checkpoint}.{os.getpid()}.tmp"
+                with open(tmp, "w") as f:
+                    json.dump({"target": target, "es": es.state(), "scale": scale}, f)
+                os.replace(tmp, checkpoint)
+        table = to_table(es.mean)
+        game_rng = random.Random(f"{seed}/final/{es.generation}")
+        games = [random_opening(game_rng, OPENING_PLIES) for _ in range(FINAL_OPENINGS)]
+        fitness, by_opponent, _ = evaluate(pool, [table], target, opponents, games)
+    finally:
+        pool.close()
+        pool.join()
+    return {"table": table, "scale": scale, "fitness": fitness[0], "vs": by_opponent[0], "generation": es.generation}
+
+
+def knowledge_table(table, scale):
+    # Back at the start table's scale, so learn_from_result's steps keep their weight
+    return [[v * scale / 100 for v in row] for row in table]
+
+def format_table(table):
+    # As a POSITION_VALUES literal for othello_engine.py
+    width = max(len(str(v)) for row in table for v in row)
+    return "POSITION_VALUES = [\n" + "".join(
+        "    [" + ", ".join(str(v).rjust(width) for v in row) + "],\n" for row in table) + "]"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune a square-value table with CMA-ES against an opponent pool.")
+    parser.add_argument("--target", choices=["evolver", "engine"], default="evolver")
+    parser.add_argument("--generations", type=int, default=50, help="total, counting resumed ones")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--population", type=int, help="candidates per generation (default 4 + 3 ln 10)")
+    parser.add_argument("--openings", type=int, default=OPENINGS, help="openings per generation, each played twice")
+    parser.add_argument("--opponents", default=",".join(OPPONENTS), help="comma-separated subset of: " + ", ".join(OPPONENTS))
+    parser.add_argument("--depth", type=int, default=DEPTH, help="search depth of the engine target and Alpha-Beta")
+    parser.add_argument("--sigma", type=float, default=SIGMA)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--knowledge", default=KNOWLEDGE_FILE, help="the Evolver opponent, and the evolver start")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE)
+    parser.add_argument("--log", help="JSONL file receiving one line per generation")
+    parser.add_argument("--export", help="write the final table here (.json for the legacy knowledge format)")
+    args = parser.parse_args(argv)
+
+    opponents = args.opponents.split(",")
+    for name in opponents:
+        if name not in OPPONENTS: parser.error(f"unknown opponent {name}")
+    result = tune(args.generations, args.jobs, args.target, args.depth, opponents, args.openings, args.population,
+                  args.sigma, args.seed, args.checkpoint, args.knowledge, args.log)
+    table = result["table"]
+    print(f"mean after generation {result['generation']}: fitness {result['fitness']:.3f} on fresh openings ("
+          + ", ".join(f"{k} {v:.2f}" for k, v in result["vs"].items()) + "), "
+          + ", ".join(f"{square_name(sq)} {table[sq >> 3][sq & 7]}" for sq in BASE_SQUARES))
+    print(format_table(table))
+    if args.export:
+        if args.target == "evolver": table = knowledge_table(table, result["scale"])
+        if args.export.endswith(".json"):
+            with open(args.export, "w") as f:
+                json.dump(table, f)
+        else:
+            save_knowledge(table, args.export)
+        print(f"saved to {args.export}")
+
+if __name__ == "__main__":
+    main()
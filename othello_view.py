@@ -0,0 +1,35 @@
+# Persistent canvas model shared by the three GUIs: the grid and one oval per
+# square are created once; draw() only touches squares whose colour changed.
+from othello_core import squares
+
+RENDER_CHOICES = ["every", "every 10th", "every 100th", "off"]  # throttle settings for training
+RENDER_EVERY = {"every": 1, "every 10th": 10, "every 100th": 100, "off": 0}
+
+
+class BoardView:
+    def __init__(self, canvas, square_size, pad, outline="black"):
+        self.canvas = canvas
+        self.ovals = []
+        for sq in range(64):
+            x, y = (sq & 7) * square_size, (sq >> 3) * square_size
+            canvas.create_rectangle(x, y, x + square_size, y + square_size, outline=outline)
+            self.ovals.append(canvas.create_oval(x + pad, y + pad, x + square_size - pad, y + square_size - pad,
+                                                 state="hidden"))
+        self.black = self.white = 0
+        self.every = 1  # draw every Nth frame offered by a training loop; 0 = never
+        self.frame = 0
+
+    def draw(self, black, white):
+        # Recolours flipped discs, shows placed ones and hides removed ones
+        changed = (black ^ self.black) | (white ^ self.white)
+        item = self.canvas.itemconfigure
+        for sq in squares(changed):
+            if black >> sq & 1: item(self.ovals[sq], fill="black", state="normal")
+            elif white >> sq & 1: item(self.ovals[sq], fill="white", state="normal")
+            else: item(self.ovals[sq], state="hidden")
+        self.black, self.white = black, white
+
+    def frame_ready(self):
+        # For training loops: True on the frames the throttle lets through
+        self.frame += 1
+        return self.every > 0 and self.frame % self.every == 0
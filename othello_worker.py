@@ -0,0 +1,79 @@
+# Background process for the GUIs: searches and training loops run here so the
+# Tk main loop only polls a queue with after() and never blocks.
+#
+# A Worker keeps one process alive with a long-lived object made by `factory`
+# (an OthelloEngine keeps its transposition table between moves, for example).
+# A job is a top-level function called as fn(state, progress, *args); it may call
+# progress(**fields) any number of times and its return value ends the job.
+import multiprocessing as mp
+import queue
+import traceback
+
+PROGRESS, DONE, ERROR = "progress", "done", "error"
+
+
+def _serve(factory, jobs, results):
+    state = factory() if factory else None
+    while True:
+        job = jobs.get()
+        if job is None: break
+        job_id, fn, args = job
+        progress = lambda **fields: results.put((job_id, PROGRESS, fields))
+        try:
+            results.put((job_id, DONE, fn(state, progress, *args)))
+        except Exception:
+            results.put((job_id, ERROR, traceback.format_exc()))
+
+
+class Worker:
+    def __init__(self, factory=None):
+        self.factory = factory
+        self.process = None
+        self.job_id = 0
+        self.busy = False
+
+    def _spawn(self):
+        self.jobs, self.results = mp.Queue(), mp.Queue()
+        self.process = mp.Process(target=_serve, args=(self.factory, self.jobs, self.results), daemon=True)
+        self.process.start()
+
+    def submit(self, fn, *args):
+        # Starts a job and returns its id; a job still running is cancelled first
+        if self.busy: self.cancel()
+        if self.process is None: self._spawn()
+        self.job_id += 1
+        self.busy = True
+        self.jobs.put((self.job_id, fn, args))
+        return self.job_id
+
+    def poll(self):
+        # Messages of the current job that arrived since the last poll: (kind, payload)
+        messages = []
+        if self.process is None: return messages
+        while True:
+            try:
+                job_id, kind, payload = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if job_id != self.job_id: continue  # left over from a cancelled job
+            if kind != PROGRESS: self.busy = False
+            messages.append((kind, payload))
+        return messages
+
+    def cancel(self):
+        # Stops the current job at once; the process (and its state) is rebuilt on the next submit
+        if self.process is not None and self.busy:
+            self.process.terminate()
+            self.process.join()
+            self.process = None
+        self.busy = False
+
+    def close(self):
+        if self.process is not None:
+            if self.busy:
+                self.process.terminate()
+            else:
+                self.jobs.put(None)
+            self.process.join()
+            self.process = None
+        self.busy = False
@@ -0,0 +1,61 @@
+import os
+from othello_core import legal_moves, make_move, popcount, squares, START_BLACK, START_WHITE
+from othello_games import GameWriter, GameArchive, positions
+
+
+def sample_game(skip):
+    # A legal game: the `skip`-th legal move (mod their count) each turn, passes included
+    own, opp, player, moves = START_BLACK, START_WHITE, 1, []
+    while True:
+        legal = list(squares(legal_moves(own, opp)))
+        if not legal:
+            if not legal_moves(opp, own): break
+            own, opp, player = opp, own, 3 - player
+            continue
+        sq = legal[skip % len(legal)]
+        own, opp, _ = make_move(own, opp, sq)
+        own, opp, player = opp, own, 3 - player
+        moves.append(sq)
+    black, white = (own, opp) if player == 1 else (opp, own)
+    return moves, popcount(black), popcount(white)
+
+def write_blocks(path, games, block_games):
+    with GameWriter(path, "test", block_games) as writer:
+        for game in games: writer.add(*game)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "a.games")
+    games = [sample_game(i) for i in range(10)]
+    write_blocks(path, games, 4)
+    archive = GameArchive(path)
+    assert len(archive) == 10 and len(archive.blocks) == 3
+    assert list(archive) == games
+    assert archive[5] == games[5] and archive[9] == games[9]
+    for moves, _, _ in games:
+        assert [sq for *_, sq in positions(moves)] == moves
+
+def test_torn_tail_then_append(tmp_path):
+    path = str(tmp_path / "a.games")
+    games = [sample_game(i) for i in range(8)]
+    write_blocks(path, games[:4], 2)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 5)  # the second block torn by a killed job
+    archive = GameArchive(path)
+    assert list(archive) == games[:2] and archive.skipped > 0
+
+    write_blocks(path, games[4:], 4)
+    archive = GameArchive(path)
+    assert list(archive) == games[:2] + games[4:]
+    assert archive.skipped == 0
+
+def test_damaged_block_is_skipped(tmp_path):
+    path = str(tmp_path / "a.games")
+    games = [sample_game(i) for i in range(6)]
+    write_blocks(path, games, 2)
+    start = GameArchive(path).blocks[1][1]
+    with open(path, "r+b") as f:
+        f.seek(start + 3)
+        f.write(b"\xff")
+    archive = GameArchive(path)
+    assert list(archive) == games[:2] + games[4:]